@@ -10,6 +10,8 @@ import json
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from src.output_handler import RESULTS_JSONL_FILE, checkpoint_log_path, read_checkpoint_log
+
 def get_directory_size(path: Path) -> int:
     """Get total size of directory in bytes."""
     total = 0
@@ -122,16 +124,31 @@ def print_cleanup_stats(output_dir: str):
         file_count = len(list(results_path.glob("*.json")))
         print(f"Results directory:")
         print(f"  Files: {file_count}")
+        jsonl_path = results_path / RESULTS_JSONL_FILE
+        if jsonl_path.exists():
+            with open(jsonl_path, 'rb') as f:
+                jsonl_results = sum(1 for _ in f)
+            print(f"  Results in {RESULTS_JSONL_FILE}: {jsonl_results}")
         print(f"  Size: {format_size(size)}")
 
     # Checkpoint
+    # Frames appended to the checkpoint log during a run are not in checkpoint.json yet
     checkpoint_path = output_path / "checkpoint.json"
-    if checkpoint_path.exists():
-        with open(checkpoint_path, 'r') as f:
-            checkpoint = json.load(f)
+    checkpoint_log = checkpoint_log_path(checkpoint_path)
+    if checkpoint_path.exists() or checkpoint_log.exists():
+        checkpoint = {}
+        if checkpoint_path.exists():
+            with open(checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+        processed = set(checkpoint.get('processed_frames', []))
+        log_names, _ = read_checkpoint_log(checkpoint_log)
+        processed.update(log_names)
+        last_updated = checkpoint.get('last_updated', 'N/A')
+        if checkpoint_log.exists():
+            last_updated = datetime.fromtimestamp(checkpoint_log.stat().st_mtime).isoformat()
         print(f"\nCheckpoint:")
-        print(f"  Processed frames: {checkpoint.get('total_processed', 0)}")
-        print(f"  Last updated: {checkpoint.get('last_updated', 'N/A')}")
+        print(f"  Processed frames: {len(processed)}")
+        print(f"  Last updated: {last_updated}")
 
     # Log file
     log_path = output_path / "processing.log"
@@ -9,8 +9,10 @@ from pathlib import Path
 from typing import List, Dict, Any
 from collections import defaultdict
 
+from src.output_handler import RESULTS_JSONL_FILE, iter_jsonl_results
+
 def load_results(results_dir: str) -> Dict[str, Dict[str, Any]]:
-    """Load all result JSON files into a dictionary."""
+    """Load all results (per-frame JSON files, then results.jsonl) into a dictionary."""
     results = {}
     results_path = Path(results_dir)
 
@@ -27,6 +29,14 @@ def load_results(results_dir: str) -> Dict[str, Dict[str, Any]]:
         except Exception as e:
             print(f"Warning: Failed to load {json_file}: {e}")
 
+    # Results written in the "jsonl" results_format, one per line
+    for result, error in iter_jsonl_results(results_path / RESULTS_JSONL_FILE):
+        if error:
+            print(f"Warning: {error}")
+            continue
+        frame_name = result.get("metadata", {}).get("frame_name", f"results_{len(results)}")
+        results[frame_name] = result
+
     return results
 
 def compare_results(results1: Dict, results2: Dict) -> Dict[str, Any]:
@@ -43,8 +43,8 @@ def example_basic_usage():
     # Get first frame
     frame_iterator = dataset_loader.get_frame_iterator(max_frames=1)
     for frame in frame_iterator:
-        print(f"Frame name: {frame.frame.context.name}")
-        print(f"Timestamp: {frame.frame.timestamp_micros}")
+        print(f"Frame name: {frame.name}")
+        print(f"Timestamp: {frame.timestamp_micros}")
 
         # Extract images
         images = image_processor.process_images(frame)
@@ -192,7 +192,7 @@ def example_output_handling():
     print("✓ Result saved")
 
     # Save checkpoint
-    processed_frames = {"segment-example_timestamp-001"}
+    processed_frames = dict.fromkeys(["segment-example_timestamp-001"])
     output_handler.save_checkpoint(processed_frames)
     print("✓ Checkpoint saved")
 
@@ -10,8 +10,10 @@ from datetime import datetime
 from typing import List, Dict, Any
 from collections import defaultdict
 
+from src.output_handler import RESULTS_JSONL_FILE, iter_jsonl_results
+
 def load_results(results_dir: str) -> List[Dict[str, Any]]:
-    """Load all result JSON files."""
+    """Load all results: per-frame JSON files, then results.jsonl."""
     results = []
     results_path = Path(results_dir)
 
@@ -27,6 +29,13 @@ def load_results(results_dir: str) -> List[Dict[str, Any]]:
         except Exception as e:
             print(f"Warning: Failed to load {json_file}: {e}")
 
+    # Results written in the "jsonl" results_format, one per line
+    for result, error in iter_jsonl_results(results_path / RESULTS_JSONL_FILE):
+        if error:
+            print(f"Warning: {error}")
+            continue
+        results.append(result)
+
     return results
 
 def generate_report(results: List[Dict], output_file: str):
@@ -4,13 +4,31 @@ Merge results from multiple pipeline runs.
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 from collections import defaultdict
 
-def load_results(results_dir: str) -> List[Dict[str, Any]]:
-    """Load all result JSON files from a directory."""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.output_handler import RESULTS_JSONL_FILE, iter_jsonl_results
+
+# Threads writing merged result files
+WRITE_WORKERS = 8
+
+def load_results(results_dir: str,
+                 fields: Optional[FrozenSet[str]] = None) -> List[Dict[str, Any]]:
+    """Load all results from a directory: JSON files, then results.jsonl.
+
+    If ``fields`` is given, each result is reduced to those top-level keys
+    right after loading. ``metadata`` is always kept since it carries the
+    frame name used for output file names.
+    """
     results = []
     results_path = Path(results_dir)
 
@@ -20,16 +38,66 @@ def load_results(results_dir: str) -> List[Dict[str, Any]]:
 
     for json_file in sorted(results_path.glob("*.json")):
         try:
-            with open(json_file, 'r') as f:
-                result = json.load(f)
-                results.append(result)
+            # Cheaply reject empty or truncated files (e.g. from an interrupted
+            # write) before paying for a full read and decode
+            size = os.stat(json_file).st_size
+            if size < 2:
+                print(f"Warning: Skipping empty file {json_file}")
+                continue
+            with open(json_file, 'rb') as f:
+                f.seek(-min(size, 64), os.SEEK_END)
+                if f.read().rstrip()[-1:] not in (b'}', b']'):
+                    print(f"Warning: Skipping truncated file {json_file}")
+                    continue
+                f.seek(0)
+                data = f.read()
+            result = orjson.loads(data) if orjson is not None else json.loads(data)
+            if fields is not None:
+                result = {k: v for k, v in result.items() if k in fields or k == "metadata"}
+            results.append(result)
         except Exception as e:
             print(f"Warning: Failed to load {json_file}: {e}")
 
+    # Results written in the "jsonl" results_format, one per line
+    for result, error in iter_jsonl_results(results_path / RESULTS_JSONL_FILE):
+        if error:
+            print(f"Warning: {error}")
+            continue
+        if fields is not None:
+            result = {k: v for k, v in result.items() if k in fields or k == "metadata"}
+        results.append(result)
+
     return results
 
-def merge_results(results_dirs: List[str], output_dir: str):
-    """Merge results from multiple directories."""
+def _frame_name(result: Dict[str, Any], index: int) -> str:
+    """Get the output name for a result, falling back to its merge index."""
+    return result.get("metadata", {}).get("frame_name", f"frame_{index:06d}")
+
+def _write_one(args: Tuple[str, Dict[str, Any], bool]) -> Optional[str]:
+    """Write a single merged result. Returns an error message on failure."""
+    output_file, result, compact = args
+    try:
+        if orjson is not None:
+            option = 0 if compact else orjson.OPT_INDENT_2
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(result, option=option))
+        else:
+            with open(output_file, 'w') as f:
+                if compact:
+                    json.dump(result, f, separators=(',', ':'))
+                else:
+                    json.dump(result, f, indent=2)
+    except Exception as e:
+        return f"Failed to save {output_file}: {e}"
+    return None
+
+def merge_results(results_dirs: List[str], output_dir: str, compact: bool = True,
+                  fields: Optional[FrozenSet[str]] = None):
+    """Merge results from multiple directories.
+
+    Per-frame results are written as compact JSON unless ``compact`` is False;
+    the small merged summary is always indented.
+    """
     print(f"Merging results from {len(results_dirs)} directories...\n")
 
     all_results = []
@@ -37,7 +105,7 @@ def merge_results(results_dirs: List[str], output_dir: str):
 
     for results_dir in results_dirs:
         print(f"Loading from: {results_dir}")
-        results = load_results(results_dir)
+        results = load_results(results_dir, fields)
         all_results.extend(results)
         total_frames += len(results)
         print(f"  Loaded {len(results)} results")
@@ -51,17 +119,21 @@ def merge_results(results_dirs: List[str], output_dir: str):
     # Save merged results
     print(f"\nSaving merged results to: {output_dir}")
 
-    for i, result in enumerate(all_results):
-        frame_name = result.get("metadata", {}).get("frame_name", f"frame_{i:06d}")
-        output_file = output_path / f"{frame_name}.json"
+    # One result per frame name, the last directory winning as in a sequential
+    # write, so no two workers ever write the same file
+    merged = {_frame_name(result, i): result for i, result in enumerate(all_results)}
 
-        try:
-            with open(output_file, 'w') as f:
-                json.dump(result, f, indent=2)
-        except Exception as e:
-            print(f"Warning: Failed to save {output_file}: {e}")
+    # Threads rather than processes: results need no pickling, and the file
+    # writes overlap. Output paths are built by string concatenation to avoid
+    # a Path object per frame.
+    prefix = os.fspath(output_path) + os.sep
+    jobs = ((prefix + frame_name + ".json", result, compact) for frame_name, result in merged.items())
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        for error in executor.map(_write_one, jobs):
+            if error:
+                print(f"Warning: {error}")
 
-    print(f"✓ Saved {len(all_results)} merged results")
+    print(f"✓ Saved {len(merged)} merged results")
 
     # Generate merged summary
     print("\nGenerating merged summary...")
@@ -71,6 +143,8 @@ def merge_results(results_dirs: List[str], output_dir: str):
         "source_directories": results_dirs,
         "merged_output_directory": output_dir,
     }
+    if fields is not None:
+        summary["fields"] = sorted(fields)
 
     summary_file = output_path / "merged_summary.json"
     with open(summary_file, 'w') as f:
@@ -80,17 +154,26 @@ def merge_results(results_dirs: List[str], output_dir: str):
 
 def main():
     """Main entry point."""
-    if len(sys.argv) < 3:
-        print("Usage: python merge_results.py <output_dir> <results_dir1> [results_dir2] ...")
-        print("\nExample:")
-        print("  python merge_results.py ./merged_output ./output1/results ./output2/results")
-        return 1
-
-    output_dir = sys.argv[1]
-    results_dirs = sys.argv[2:]
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Merge results from multiple pipeline runs",
+        epilog="Example: python merge_results.py ./merged_output ./output1/results ./output2/results",
+    )
+    parser.add_argument("output_dir", help="Directory to write merged results to")
+    parser.add_argument("results_dirs", nargs="+", help="Result directories to merge")
+    parser.add_argument("--compact", action=argparse.BooleanOptionalAction, default=True,
+                        help="Write per-frame results as compact JSON (default: on; "
+                             "use --no-compact for indented output)")
+    parser.add_argument("--fields", type=str,
+                        help="Comma-separated top-level keys to keep in each merged result "
+                             "(e.g. 'vlm_response,token_usage'); metadata is always kept")
+
+    args = parser.parse_args()
+    fields = frozenset(f.strip() for f in args.fields.split(",") if f.strip()) if args.fields else None
 
     try:
-        merge_results(results_dirs, output_dir)
+        merge_results(args.results_dirs, args.output_dir, compact=args.compact, fields=fields)
         print("\n✓ Merge completed successfully!")
         return 0
     except Exception as e:
@@ -9,16 +9,84 @@ import json
 import time
 from pathlib import Path
 from datetime import datetime
+from typing import Optional, Set, Tuple
+
+from src.output_handler import RESULTS_JSONL_FILE, checkpoint_log_path, read_checkpoint_log
+
+# checkpoint_path -> ((st_mtime_ns, st_size), parsed checkpoint)
+_checkpoint_cache = {}
+# log path -> ((st_ino, read offset), frame names read so far, st_mtime)
+_log_cache = {}
+# results.jsonl path -> ((st_ino, read offset), results counted so far)
+_jsonl_cache = {}
+
+def _load_checkpoint_json(checkpoint_path: str) -> Optional[dict]:
+    """Parse checkpoint.json, re-reading it only when its mtime or size changes."""
+    try:
+        st = os.stat(checkpoint_path)
+    except OSError:
+        _checkpoint_cache.pop(checkpoint_path, None)
+        return None
+
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _checkpoint_cache.get(checkpoint_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
 
-def get_checkpoint_info(checkpoint_path: str) -> dict:
-    """Get information from checkpoint file."""
     try:
         with open(checkpoint_path, 'r') as f:
             checkpoint = json.load(f)
-        return checkpoint
-    except:
+    except (OSError, ValueError):
+        return None
+
+    _checkpoint_cache[checkpoint_path] = (key, checkpoint)
+    return checkpoint
+
+def _load_checkpoint_log(log_path: str) -> Optional[Tuple[Set[str], float]]:
+    """Frame names in the checkpoint log, reading only what was appended since the last call.
+
+    Returns (frame names, log mtime), or None if there is no log.
+    """
+    try:
+        st = os.stat(log_path)
+    except OSError:
+        _log_cache.pop(log_path, None)
         return None
 
+    cached = _log_cache.get(log_path)
+    if cached is not None and cached[0][0] == st.st_ino and cached[0][1] <= st.st_size:
+        (_, offset), names, _ = cached
+    else:
+        # New, compacted (replaced) or truncated log: start over
+        offset, names = 0, set()
+
+    new_names, offset = read_checkpoint_log(log_path, offset)
+    names.update(new_names)
+    _log_cache[log_path] = ((st.st_ino, offset), names, st.st_mtime)
+    return names, st.st_mtime
+
+def get_checkpoint_info(checkpoint_path: str) -> Optional[dict]:
+    """Get information from checkpoint file.
+
+    While a run is going, frames are appended to the checkpoint log and only
+    folded into checkpoint.json when the run ends, so both are combined here.
+    The parsed checkpoint is cached per path and only re-read when the file's
+    mtime or size changes, and the log is read incrementally, so an unchanged
+    checkpoint costs a couple of stat() calls per refresh.
+    """
+    checkpoint = _load_checkpoint_json(checkpoint_path)
+    log = _load_checkpoint_log(str(checkpoint_log_path(checkpoint_path)))
+    if log is None:
+        return checkpoint
+
+    log_names, log_mtime = log
+    checkpoint = dict(checkpoint or {})
+    processed = checkpoint.get("processed_frames", [])
+    checkpoint["total_processed"] = len(log_names.union(processed))
+    last_updated = datetime.fromtimestamp(log_mtime).isoformat()
+    checkpoint["last_updated"] = max(checkpoint.get("last_updated", ""), last_updated)
+    return checkpoint
+
 def get_log_tail(log_path: str, lines: int = 20) -> list:
     """Get last N lines from log file."""
     try:
@@ -28,17 +96,46 @@ def get_log_tail(log_path: str, lines: int = 20) -> list:
     except:
         return []
 
+def _count_jsonl_results(jsonl_path: str) -> int:
+    """Count the results in results.jsonl, reading only what was appended since the last call."""
+    try:
+        st = os.stat(jsonl_path)
+    except OSError:
+        _jsonl_cache.pop(jsonl_path, None)
+        return 0
+
+    cached = _jsonl_cache.get(jsonl_path)
+    if cached is None or cached[0][0] != st.st_ino or st.st_size < cached[0][1]:
+        offset, count = 0, 0
+    else:
+        (_, offset), count = cached
+
+    try:
+        with open(jsonl_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return count
+    count += data.count(b'\n')
+    _jsonl_cache[jsonl_path] = ((st.st_ino, offset + len(data)), count)
+    return count
+
 def get_output_stats(output_dir: str) -> dict:
-    """Get statistics about output files."""
+    """Get statistics about output files (per-frame JSON files and results.jsonl)."""
     results_dir = Path(output_dir) / "results"
     if not results_dir.exists():
-        return {"total_files": 0, "total_size_mb": 0}
+        return {"total_files": 0, "jsonl_results": 0, "total_size_mb": 0}
 
     files = list(results_dir.glob("*.json"))
     total_size = sum(f.stat().st_size for f in files)
+    jsonl_path = results_dir / RESULTS_JSONL_FILE
+    jsonl_results = _count_jsonl_results(str(jsonl_path))
+    if jsonl_results:
+        total_size += jsonl_path.stat().st_size
 
     return {
         "total_files": len(files),
+        "jsonl_results": jsonl_results,
         "total_size_mb": total_size / (1024 * 1024),
     }
 
@@ -86,6 +183,8 @@ def monitor_pipeline(output_dir: str = "./output", interval: int = 5):
             print_section("OUTPUT STATISTICS")
             stats = get_output_stats(output_dir)
             print(f"Result files: {stats['total_files']}")
+            if stats['jsonl_results']:
+                print(f"Results in {RESULTS_JSONL_FILE}: {stats['jsonl_results']}")
             print(f"Total size: {stats['total_size_mb']:.2f} MB")
 
             # Recent log entries
@@ -8,6 +8,11 @@ import sys
 from pathlib import Path
 import yaml
 
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
 def print_header(text):
     """Print formatted header."""
     print("\n" + "=" * 70)
@@ -50,18 +55,14 @@ def setup_wizard():
     print_section("Step 3: Configure Dataset Path")
     print("You need to configure the dataset path in config.yaml\n")
 
+    # Load config once; steps 3-5 edit it in memory and it is written after step 5
+    with open("config.yaml", 'r') as f:
+        config = yaml.load(f, Loader=_Loader)
+
     dataset_path = input("Enter the path to your Waymo dataset (e.g., /path/to/training.tfrecord*): ").strip()
 
     if dataset_path:
-        # Load and update config
-        with open("config.yaml", 'r') as f:
-            config = yaml.safe_load(f)
-
         config['dataset']['path'] = dataset_path
-
-        with open("config.yaml", 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
-
         print(f"✓ Dataset path updated: {dataset_path}")
     else:
         print("⚠ Dataset path not set. Update config.yaml manually.")
@@ -75,11 +76,7 @@ def setup_wizard():
     mode = input("Choose mode (1 or 2, default: 1): ").strip() or "1"
 
     if mode == "2":
-        with open("config.yaml", 'r') as f:
-            config = yaml.safe_load(f)
         config['image_processing']['input_mode'] = "concatenated"
-        with open("config.yaml", 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
         print("✓ Image mode set to: concatenated")
     else:
         print("✓ Image mode set to: separate")
@@ -101,11 +98,11 @@ def setup_wizard():
 
     model = models.get(model_choice, "gemini-2.5-flash")
 
-    with open("config.yaml", 'r') as f:
-        config = yaml.safe_load(f)
     config['vlm_api']['model_name'] = model
+
+    # Write all wizard changes back in one pass
     with open("config.yaml", 'w') as f:
-        yaml.dump(config, f, default_flow_style=False)
+        yaml.dump(config, f, Dumper=_Dumper, default_flow_style=False)
 
     print(f"✓ VLM model set to: {model}")
 
@@ -1 +1,38 @@
 # Source code modules
+#
+# Public classes are re-exported lazily, so importing the package (or a light
+# submodule such as src.config) does not pull in TensorFlow, OpenCV or the
+# OpenAI SDK.
+
+import importlib
+
+from .utils import EAGER_IMPORT
+
+# Attribute name -> submodule defining it
+_LAZY_ATTRS = {
+    "WaymoE2EConfig": "config",
+    "WaymoE2EDatasetLoader": "dataset_loader",
+    "FrameView": "frame_view",
+    "ImageProcessor": "image_processor",
+    "TrajectoryExtractor": "trajectory_extractor",
+    "PromptBuilder": "prompt_builder",
+    "VLMClient": "vlm_client",
+    "ResponseCache": "vlm_client",
+    "OutputHandler": "output_handler",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+if EAGER_IMPORT:
+    for _name in _LAZY_ATTRS:
+        __getattr__(_name)
@@ -1,11 +1,120 @@
 """Configuration system for Waymo E2E dataset processing pipeline."""
 
+import json
 import os
 import yaml
+from operator import attrgetter
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Part of the YAML sidecar cache key; bumped when the sidecar rules change so
+# sidecars written by older versions are ignored
+_YAML_CACHE_VERSION = 2
+
+
+def _load_yaml(config_path: str) -> Dict[str, Any]:
+    """Parse a YAML file with the fastest available safe loader."""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_Loader) or {}
+
+
+def _load_yaml_cached(config_path: str) -> Dict[str, Any]:
+    """
+    Parse a YAML file, reusing a JSON sidecar cache while the file is unchanged.
+
+    The parsed data is stored in ``<config_path>.cache.json`` as
+    ``{"__key__": "<version>-<mtime_ns>-<size>", "data": ...}``. The key is written first,
+    so a stale cache is rejected by comparing a prefix, before any parsing. The
+    sidecar is only written when JSON round-trips the data exactly; YAML values
+    JSON would change (dates, non-string keys, ...) are always parsed from YAML.
+
+    Args:
+        config_path: Path to the YAML file
+
+    Returns:
+        Parsed YAML content (empty dict for an empty file)
+    """
+    st = os.stat(config_path)
+    key = f"{_YAML_CACHE_VERSION}-{st.st_mtime_ns}-{st.st_size}"
+    cache_path = f"{config_path}.cache.json"
+    prefix = '{"__key__":' + json.dumps(key) + ','
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = f.read()
+        if cached.startswith(prefix.encode('utf-8')):
+            return (orjson.loads(cached) if orjson is not None else json.loads(cached))["data"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    data = _load_yaml(config_path)
+
+    # Best effort: an unwritable directory or non-JSON YAML values just skip caching
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        if orjson is not None:
+            data_json = orjson.dumps(data)
+            lossless = orjson.loads(data_json) == data
+        else:
+            data_json = json.dumps(data, separators=(',', ':')).encode('utf-8')
+            lossless = json.loads(data_json) == data
+        if not lossless:
+            return data
+        payload = (prefix + '"data":').encode('utf-8') + data_json + b'}'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+    return data
+
+
+def _positive(value) -> bool:
+    return value > 0
+
+
+def _non_negative(value) -> bool:
+    return value >= 0
+
+
+# Static config checks as (getter, predicate, error message), applied in order by
+# WaymoE2EConfig.validate. Environment and filesystem checks stay inline there.
+_VALIDATION_RULES = (
+    (attrgetter("dataset.path"), bool,
+     "dataset.path is required"),
+    (attrgetter("image_processing.target_height"), _positive,
+     "image_processing.target_height must be positive"),
+    (attrgetter("image_processing.input_mode"), frozenset(("separate", "concatenated")).__contains__,
+     "image_processing.input_mode must be 'separate' or 'concatenated'"),
+    (attrgetter("image_processing.encode_workers"), _non_negative,
+     "image_processing.encode_workers must not be negative"),
+    (attrgetter("trajectory.past_frequency_hz"), _positive,
+     "trajectory.past_frequency_hz must be positive"),
+    (attrgetter("trajectory.future_frequency_hz"), _positive,
+     "trajectory.future_frequency_hz must be positive"),
+    (attrgetter("vlm_api.concurrency"), _positive,
+     "vlm_api.concurrency must be positive"),
+    (attrgetter("processing.checkpoint_interval"), _positive,
+     "processing.checkpoint_interval must be positive"),
+    (attrgetter("output.results_format"), frozenset(("json", "jsonl")).__contains__,
+     "output.results_format must be 'json' or 'jsonl'"),
+)
+
 
 @dataclass
 class DatasetConfig:
@@ -21,6 +130,7 @@ class ImageProcessingConfig:
     cameras: list = field(default_factory=lambda: ["FRONT_LEFT", "FRONT", "FRONT_RIGHT"])
     input_mode: str = "separate"  # "separate" or "concatenated"
     jpeg_quality: int = 90
+    encode_workers: int = 0  # Worker processes for image decode/encode (0 = in-process)
 
 
 @dataclass
@@ -42,6 +152,16 @@ class VLMAPIConfig:
     max_retries: int = 3
     retry_delay_seconds: float = 2.0
     timeout_seconds: int = 60
+    concurrency: int = 8  # Maximum in-flight VLM requests (pipeline and batched calls)
+    response_cache_path: Optional[str] = None  # SQLite file caching responses (None disables)
+    response_cache_ttl_seconds: Optional[float] = None  # None keeps cached responses forever
+    # Send provider prompt-caching hints (cache_control, prompt_cache_key); endpoints
+    # that do not know them reject every request with a 400
+    prompt_caching: bool = False
+    # Sampling temperature; None keeps the model's default (0 if the response cache is on)
+    temperature: Optional[float] = None
+    # Resolved API key, cached by WaymoE2EConfig.get_api_key (never printed)
+    _api_key: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
 
 @dataclass
@@ -62,6 +182,7 @@ class OutputConfig:
     checkpoint_file: str = "checkpoint.json"
     log_file: str = "processing.log"
     save_images: bool = False
+    results_format: str = "json"  # "json" (one file per frame) or "jsonl" (single results.jsonl)
 
 
 @dataclass
@@ -87,8 +208,7 @@ class WaymoE2EConfig:
     @classmethod
     def from_yaml(cls, config_path: str) -> "WaymoE2EConfig":
         """Load configuration from YAML file."""
-        with open(config_path, 'r') as f:
-            config_dict = yaml.safe_load(f)
+        config_dict = _load_yaml_cached(config_path)
 
         return cls(
             dataset=DatasetConfig(**config_dict.get('dataset', {})),
@@ -102,48 +222,31 @@ class WaymoE2EConfig:
 
     def validate(self) -> bool:
         """Validate configuration parameters."""
-        errors = []
-
-        # Validate dataset path
-        if not self.dataset.path:
-            errors.append("dataset.path is required")
-
-        # Validate image processing
-        if self.image_processing.target_height <= 0:
-            errors.append("image_processing.target_height must be positive")
-
-        if self.image_processing.input_mode not in ["separate", "concatenated"]:
-            errors.append("image_processing.input_mode must be 'separate' or 'concatenated'")
-
-        # Validate trajectory
-        if self.trajectory.past_frequency_hz <= 0:
-            errors.append("trajectory.past_frequency_hz must be positive")
-
-        if self.trajectory.future_frequency_hz <= 0:
-            errors.append("trajectory.future_frequency_hz must be positive")
+        errors = [message for getter, check, message in _VALIDATION_RULES
+                  if not check(getter(self))]
 
         # Validate VLM API
-        api_key = os.getenv(self.vlm_api.api_key_env_var)
-        if not api_key:
-            errors.append(f"Environment variable {self.vlm_api.api_key_env_var} not set")
+        try:
+            self.get_api_key()
+        except ValueError as e:
+            errors.append(str(e))
 
         if not os.path.exists(self.vlm_api.prompt_template_path):
             errors.append(f"Prompt template not found: {self.vlm_api.prompt_template_path}")
 
-        # Validate processing
-        if self.processing.checkpoint_interval <= 0:
-            errors.append("processing.checkpoint_interval must be positive")
-
         if errors:
             raise ValueError("Configuration validation failed:\n" + "\n".join(errors))
 
         return True
 
     def get_api_key(self) -> str:
-        """Get API key from environment variable."""
-        api_key = os.getenv(self.vlm_api.api_key_env_var)
-        if not api_key:
-            raise ValueError(f"Environment variable {self.vlm_api.api_key_env_var} not set")
+        """Get API key from environment variable (looked up once, then cached)."""
+        api_key = self.vlm_api._api_key
+        if api_key is None:
+            api_key = os.getenv(self.vlm_api.api_key_env_var)
+            if not api_key:
+                raise ValueError(f"Environment variable {self.vlm_api.api_key_env_var} not set")
+            self.vlm_api._api_key = api_key
         return api_key
 
     def get_run_dir(self) -> Path:
@@ -1,12 +1,133 @@
 """Dataset loader for Waymo E2E dataset."""
 
-import tensorflow as tf
+from __future__ import annotations
+
+import glob
 import logging
-from typing import Iterator, Optional
-from waymo_open_dataset.protos import end_to_end_driving_data_pb2 as wod_e2ed_pb2
+import mmap
+import os
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .frame_view import FrameView
+from .utils import lazy_import
+
+# Loaded on first use, so importing this module stays cheap
+tf = lazy_import("tensorflow")
+wod_e2ed_pb2 = lazy_import("waymo_open_dataset.protos.end_to_end_driving_data_pb2")
 
 logger = logging.getLogger(__name__)
 
+# Per-file read buffer for TFRecordDataset (bytes)
+READ_BUFFER_SIZE = 8 << 20
+
+# Threads used to parse frames ahead of the consumer, and how many frames may be in flight
+PARSE_WORKERS = 4
+PARSE_WINDOW = 16
+
+# TFRecord framing: uint64 payload length and its uint32 masked CRC, then the
+# payload, then a uint32 masked CRC of the payload
+_RECORD_HEADER = struct.Struct("<QI")
+_RECORD_FOOTER_SIZE = 4
+
+# Suffix of the record index sidecar written next to each TFRecord file. The
+# sidecar is a hidden file (".<basename>.index.npz"), so dataset globs such as
+# training.tfrecord* do not match it
+RECORD_INDEX_SUFFIX = ".index.npz"
+
+
+def record_index_path(path: str) -> str:
+    """Path of the hidden record index sidecar of a TFRecord file."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}{RECORD_INDEX_SUFFIX}")
+
+
+def _is_record_index(path: str) -> bool:
+    """Whether a path is a record index sidecar or one of its temporary files (hidden or not)."""
+    # Sidecars of earlier versions were not hidden and still match dataset globs
+    return RECORD_INDEX_SUFFIX in os.path.basename(path)
+
+
+def build_record_index(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate every record payload of an uncompressed TFRecord file.
+
+    Only the 12-byte record headers are read (through mmap), so building the
+    index touches about one page per record rather than the whole file. Unlike
+    TFRecordDataset, the masked CRCs of lengths and payloads are not verified:
+    a corrupt record is only noticed if it fails to parse as an E2EDFrame.
+
+    Args:
+        path: TFRecord file path
+
+    Returns:
+        (offsets, lengths) int64 arrays with the payload position of each record
+    """
+    offsets = []
+    lengths = []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                while pos + _RECORD_HEADER.size <= size:
+                    length, _ = _RECORD_HEADER.unpack_from(mm, pos)
+                    start = pos + _RECORD_HEADER.size
+                    end = start + length + _RECORD_FOOTER_SIZE
+                    if end > size:
+                        logger.warning("Truncated record at offset %s in %s", pos, path)
+                        break
+                    offsets.append(start)
+                    lengths.append(length)
+                    pos = end
+    return np.array(offsets, dtype=np.int64), np.array(lengths, dtype=np.int64)
+
+
+def load_record_index(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the record index of a TFRecord file, reusing an .npz sidecar while the file is unchanged.
+
+    The index is stored in the hidden file ``.<basename>.index.npz`` next to the TFRecord
+    (record_index_path) together with the file's mtime and size, and rebuilt whenever those
+    differ.
+
+    Args:
+        path: TFRecord file path
+
+    Returns:
+        (offsets, lengths) int64 arrays, as returned by build_record_index
+    """
+    st = os.stat(path)
+    key = np.array([st.st_mtime_ns, st.st_size], dtype=np.int64)
+    index_path = record_index_path(path)
+
+    try:
+        with np.load(index_path) as cached:
+            if np.array_equal(cached["key"], key):
+                return cached["offsets"], cached["lengths"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    offsets, lengths = build_record_index(path)
+
+    # Best effort: a read-only dataset directory just skips persisting the index
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, key=key, offsets=offsets, lengths=lengths)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+    return offsets, lengths
+
 
 class WaymoE2EDatasetLoader:
     """Loader for Waymo E2E dataset from TFRecord files."""
@@ -23,45 +144,123 @@ class WaymoE2EDatasetLoader:
         self.sampling_frequency_hz = sampling_frequency_hz
         self.sampling_interval = int(10 / sampling_frequency_hz)  # 10Hz dataset
 
+    def _is_local(self) -> bool:
+        """Whether the dataset path is on the local filesystem (not e.g. gs://)."""
+        return "://" not in self.dataset_path
+
+    def _local_files(self) -> List[str]:
+        """
+        List the local TFRecord files matching the dataset path, sorted.
+
+        Returns:
+            Sorted file paths
+
+        Raises:
+            FileNotFoundError: If no file matches
+        """
+        # Current sidecars are hidden, but older ones (or a pattern like .*) still match
+        filenames = sorted(
+            path for path in glob.glob(self.dataset_path) if not _is_record_index(path)
+        )
+        if not filenames:
+            raise FileNotFoundError(f"No files found matching pattern: {self.dataset_path}")
+
+        logger.info("Found %s TFRecord files", len(filenames))
+        logger.debug("Files in order: %s", filenames)
+        return filenames
+
+    def _iter_indexed_records(self, filenames: List[str]) -> Iterator[bytes]:
+        """
+        Read the sampled records of local TFRecord files through their record index.
+
+        Keeps every sampling_interval-th record across all files in order
+        (starting with the first), like sample_frames_at_target_frequency,
+        but reads only the selected payloads from disk. Record CRCs are not
+        checked (see build_record_index).
+
+        Args:
+            filenames: Sorted TFRecord file paths
+
+        Yields:
+            Raw frame bytes of each sampled record
+        """
+        interval = max(self.sampling_interval, 1)
+        ordinal = 0
+        for path in filenames:
+            offsets, lengths = load_record_index(path)
+            # Continue the global stride from the records of the previous files
+            selected = slice((-ordinal) % interval, None, interval)
+            ordinal += len(offsets)
+            if not len(offsets[selected]):
+                continue
+
+            with open(path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset, length in zip(offsets[selected].tolist(), lengths[selected].tolist()):
+                    yield mm[offset:offset + length]
+
+    def _iter_sampled_records(self) -> Iterator[bytes]:
+        """
+        Iterate over the raw bytes of the sampled records.
+
+        Local files are read through a persisted record index; other paths
+        (e.g. gs://) go through tf.data.
+
+        Yields:
+            Raw frame bytes of each sampled record, in dataset order
+        """
+        if self._is_local():
+            return self._iter_indexed_records(self._local_files())
+        return self.load_dataset().as_numpy_iterator()
+
     def load_dataset(self) -> tf.data.Dataset:
         """
-        Load TFRecord dataset.
+        Load TFRecord dataset, sampled at the target frequency.
 
         Returns:
-            TensorFlow dataset iterator
+            TensorFlow dataset of sampled raw frame bytes
         """
         filenames = tf.io.matching_files(self.dataset_path)
-        num_files = tf.size(filenames).numpy()
-        if num_files == 0:
-            raise FileNotFoundError(f"No files found matching pattern: {self.dataset_path}")
 
-        # Convert to list and sort for deterministic ordering
-        filenames_list = sorted(filenames.numpy().astype(str).tolist())
+        # Convert to list and sort for deterministic ordering; record index
+        # sidecars left next to the files are not TFRecords
+        filenames_list = sorted(
+            path for path in filenames.numpy().astype(str).tolist() if not _is_record_index(path)
+        )
         num_files = len(filenames_list)
+        if num_files == 0:
+            raise FileNotFoundError(f"No files found matching pattern: {self.dataset_path}")
 
-        logger.info(f"Found {num_files} TFRecord files")
-        logger.debug(f"Files in order: {filenames_list}")
+        logger.info("Found %s TFRecord files", num_files)
+        logger.debug("Files in order: %s", filenames_list)
 
-        dataset = tf.data.TFRecordDataset(filenames_list, compression_type='')
-        return dataset
+        # Files are read sequentially (no num_parallel_reads) so records keep their
+        # on-disk order, which both frame sampling and resume rely on. A larger read
+        # buffer and prefetch let file IO overlap with parsing on the Python side.
+        dataset = tf.data.TFRecordDataset(
+            filenames_list,
+            compression_type='',
+            buffer_size=READ_BUFFER_SIZE,
+        )
+        dataset = self.sample_frames_at_target_frequency(dataset)
+        return dataset.prefetch(tf.data.AUTOTUNE)
 
-    def sample_frames_at_target_frequency(self, dataset: tf.data.Dataset) -> Iterator[bytes]:
+    def sample_frames_at_target_frequency(self, dataset: tf.data.Dataset) -> tf.data.Dataset:
         """
         Sample frames at target frequency.
 
+        Keeps every sampling_interval-th record (starting with the first) inside
+        the tf.data graph, so dropped frames never cross into Python.
+
         Args:
             dataset: TensorFlow dataset
 
-        Yields:
-            Sampled frame bytes
+        Returns:
+            Sampled dataset
         """
-        dataset_iter = dataset.as_numpy_iterator()
-        frame_count = 0
-
-        for frame_bytes in dataset_iter:
-            if frame_count % self.sampling_interval == 0:
-                yield frame_bytes
-            frame_count += 1
+        if self.sampling_interval <= 1:
+            return dataset
+        return dataset.shard(self.sampling_interval, 0)
 
     def parse_e2ed_frame(self, frame_bytes: bytes) -> Optional[wod_e2ed_pb2.E2EDFrame]:
         """
@@ -78,10 +277,55 @@ class WaymoE2EDatasetLoader:
             frame.ParseFromString(frame_bytes)
             return frame
         except Exception as e:
-            logger.warning(f"Failed to parse E2EDFrame: {e}")
+            logger.warning("Failed to parse E2EDFrame: %s", e)
             return None
 
-    def get_frame_iterator(self, max_frames: Optional[int] = None) -> Iterator[wod_e2ed_pb2.E2EDFrame]:
+    def parse_frame_view(self, frame_bytes: bytes) -> Optional[FrameView]:
+        """
+        Parse frame bytes into a FrameView, dropping the protobuf.
+
+        Args:
+            frame_bytes: Raw frame bytes
+
+        Returns:
+            FrameView or None if parsing fails
+        """
+        frame = self.parse_e2ed_frame(frame_bytes)
+        if frame is None:
+            return None
+        return FrameView.from_proto(frame)
+
+    def _parse_frames_in_order(self, frames_bytes: Iterable[bytes]) -> Iterator[Optional[FrameView]]:
+        """
+        Parse frames on a thread pool while preserving input order.
+
+        At most PARSE_WINDOW frames are submitted ahead of the consumer, so
+        memory stays bounded regardless of dataset size.
+
+        Args:
+            frames_bytes: Iterable of raw frame bytes
+
+        Yields:
+            FrameView (or None on parse failure) for each input, in order
+        """
+        # Finish the lazy proto import on this thread: LazyLoader is not thread-safe
+        # before Python 3.12.3, and workers racing on the first attribute access
+        # can see a half-initialized module (AttributeError, frame dropped)
+        wod_e2ed_pb2.E2EDFrame
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+            pending = deque()
+            try:
+                for frame_bytes in frames_bytes:
+                    pending.append(executor.submit(self.parse_frame_view, frame_bytes))
+                    if len(pending) >= PARSE_WINDOW:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def get_frame_iterator(self, max_frames: Optional[int] = None) -> Iterator[FrameView]:
         """
         Get iterator over parsed frames with consistent ordering.
 
@@ -89,21 +333,21 @@ class WaymoE2EDatasetLoader:
             max_frames: Maximum number of frames to process (None for all)
 
         Yields:
-            Parsed E2EDFrame objects
+            FrameView objects (the parsed protobufs are not kept)
         """
-        dataset = self.load_dataset()
+        records = self._iter_sampled_records()
         frame_count = 0
 
-        logger.info(f"Starting frame iteration with sampling frequency {self.sampling_frequency_hz}Hz "
-                   f"(sampling interval: every {self.sampling_interval}th frame)")
+        logger.info("Starting frame iteration with sampling frequency %sHz "
+                    "(sampling interval: every %sth frame)",
+                    self.sampling_frequency_hz, self.sampling_interval)
 
-        for frame_bytes in self.sample_frames_at_target_frequency(dataset):
+        for frame in self._parse_frames_in_order(records):
             if max_frames and frame_count >= max_frames:
                 break
 
-            frame = self.parse_e2ed_frame(frame_bytes)
             if frame:
                 yield frame
                 frame_count += 1
             else:
-                logger.warning(f"Skipping frame {frame_count} due to parsing error")
+                logger.warning("Skipping frame %s due to parsing error", frame_count)
@@ -0,0 +1,73 @@
+"""Lightweight views of E2EDFrame protobufs holding only the fields the pipeline reads."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Sequence
+
+# Camera name mapping of the front cameras, the only ones the pipeline reads;
+# other cameras' images are not copied into the view
+CAMERA_NAME_MAP = {
+    1: "FRONT",
+    2: "FRONT_LEFT",
+    3: "FRONT_RIGHT",
+}
+
+
+@dataclass(slots=True)
+class StatesView:
+    """Ego trajectory state arrays copied out of an E2EDFrame."""
+    pos_x: Sequence[float]
+    pos_y: Sequence[float]
+    pos_z: Sequence[float]
+    vel_x: Sequence[float] = field(default_factory=tuple)
+    vel_y: Sequence[float] = field(default_factory=tuple)
+
+
+@dataclass(slots=True)
+class FrameView:
+    """
+    Minimal frame representation yielded by the dataset loader.
+
+    Holds the frame name, timestamp, raw front-camera JPEGs keyed by camera name,
+    trajectory states and intent, so the parsed protobuf (and everything else
+    it carries) can be freed as soon as the view is built.
+    """
+    name: str
+    timestamp_micros: int
+    images: Dict[int, bytes] = field(repr=False)
+    past_states: StatesView
+    future_states: StatesView
+    intent: int
+
+    @classmethod
+    def from_proto(cls, frame) -> "FrameView":
+        """
+        Build a view from a parsed E2EDFrame.
+
+        Args:
+            frame: E2EDFrame protobuf
+
+        Returns:
+            FrameView with the fields copied out of the protobuf
+        """
+        past = frame.past_states
+        future = frame.future_states
+        return cls(
+            name=frame.frame.context.name,
+            timestamp_micros=frame.frame.timestamp_micros,
+            # Reversed so the first image wins when a camera appears twice
+            images={img.name: img.image for img in reversed(frame.frame.images)
+                    if img.name in CAMERA_NAME_MAP},
+            past_states=StatesView(
+                pos_x=tuple(past.pos_x),
+                pos_y=tuple(past.pos_y),
+                pos_z=tuple(past.pos_z),
+                vel_x=tuple(past.vel_x),
+                vel_y=tuple(past.vel_y),
+            ),
+            future_states=StatesView(
+                pos_x=tuple(future.pos_x),
+                pos_y=tuple(future.pos_y),
+                pos_z=tuple(future.pos_z),
+            ),
+            intent=frame.intent,
+        )
@@ -2,24 +2,55 @@
 
 import cv2
 import numpy as np
-import tensorflow as tf
 import base64
 import logging
-from typing import List, Tuple, Optional
-from waymo_open_dataset.protos import end_to_end_driving_data_pb2 as wod_e2ed_pb2
+from typing import List, Tuple, Optional, Union
+
+from .frame_view import CAMERA_NAME_MAP, FrameView
+from .utils import lazy_import
+
+# Only needed for the fallback decoder; loaded on first use
+tf = lazy_import("tensorflow")
 
 logger = logging.getLogger(__name__)
 
-# Camera name mapping
-CAMERA_NAME_MAP = {
-    1: "FRONT",
-    2: "FRONT_LEFT",
-    3: "FRONT_RIGHT",
-}
+# libjpeg-turbo codec (PyTurboJPEG), used when installed; TensorFlow (decode) and
+# OpenCV (encode) are the fallbacks. PyTurboJPEG creates a fresh libjpeg-turbo handle
+# per call, so one shared instance is safe to use from multiple threads.
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _turbojpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _turbojpeg = None
+
+# ImageProcessor of a pool worker process, built by _init_encode_worker
+_worker_processor: Optional["ImageProcessor"] = None
+
+
+def _select_scaling_factor(height: int, min_height: int) -> Optional[Tuple[int, int]]:
+    """
+    Pick the libjpeg-turbo scaling factor that shrinks an image the most while
+    keeping it at least min_height tall.
+
+    Args:
+        height: Source image height
+        min_height: Minimum acceptable decoded height
+
+    Returns:
+        (num, denom) scaling factor, or None to decode at full size
+    """
+    best = None
+    best_height = height
+    for num, denom in _turbojpeg.scaling_factors:
+        # libjpeg-turbo rounds scaled dimensions up
+        scaled_height = -(-height * num // denom)
+        if min_height <= scaled_height < best_height:
+            best, best_height = (num, denom), scaled_height
+    return best
 
 
 class ImageProcessor:
-    """Processor for extracting and processing images from E2EDFrame."""
+    """Processor for extracting and processing images from a FrameView."""
 
     def __init__(self, target_height: int = 512, input_mode: str = "separate", jpeg_quality: int = 90):
         """
@@ -34,112 +65,192 @@ class ImageProcessor:
         self.input_mode = input_mode
         self.jpeg_quality = jpeg_quality
 
-    def extract_front_cameras(self, frame: wod_e2ed_pb2.E2EDFrame) -> List[Tuple[np.ndarray, str]]:
+        # JPEG encode parameters, built once. Baseline (non-progressive, non-optimized
+        # Huffman) encoding is pinned explicitly since it is the cheapest to produce.
+        self._jpeg_params = [
+            cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+            cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+        ]
+
+        # Reused output buffer for concatenated mode, reallocated only if the shape changes
+        self._concat_buffer: Optional[np.ndarray] = None
+
+    def extract_front_cameras(self, frame: FrameView) -> List[Tuple[np.ndarray, str]]:
         """
         Extract front-facing camera images.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
-            List of (image_array, camera_name) tuples ordered as [FRONT_LEFT, FRONT, FRONT_RIGHT]
+            List of (image_array, camera_name) tuples ordered as [FRONT_LEFT, FRONT, FRONT_RIGHT],
+            with images in BGR format
         """
         images = []
         camera_order = [2, 1, 3]  # FRONT_LEFT, FRONT, FRONT_RIGHT
 
         for camera_id in camera_order:
-            for image_content in frame.frame.images:
-                if image_content.name == camera_id:
-                    try:
-                        # Decode JPEG image
-                        image = tf.io.decode_image(image_content.image).numpy()
-                        camera_name = CAMERA_NAME_MAP.get(camera_id, f"CAMERA_{camera_id}")
-                        images.append((image, camera_name))
-                        break
-                    except Exception as e:
-                        logger.warning(f"Failed to decode image for camera {camera_id}: {e}")
-                        return []
+            image_bytes = frame.images.get(camera_id)
+            if image_bytes is None:
+                continue
+            try:
+                # Decode JPEG image
+                image = self.decode_image(image_bytes, min_height=self.target_height)
+                camera_name = CAMERA_NAME_MAP.get(camera_id, f"CAMERA_{camera_id}")
+                images.append((image, camera_name))
+            except Exception as e:
+                logger.warning("Failed to decode image for camera %s: %s", camera_id, e)
+                return []
 
         if len(images) != 3:
-            logger.warning(f"Expected 3 front cameras, got {len(images)}")
+            logger.warning("Expected 3 front cameras, got %s", len(images))
 
         return images
 
-    def downsample_image(self, image: np.ndarray) -> np.ndarray:
+    def decode_image(self, image_bytes: bytes, min_height: Optional[int] = None) -> np.ndarray:
         """
-        Downsample image to target height maintaining aspect ratio.
+        Decode an encoded camera image.
+
+        Uses libjpeg-turbo directly when available, otherwise TensorFlow. With
+        libjpeg-turbo and min_height set, the JPEG is decoded at the smallest
+        scaled-IDCT size (M/8 ratios) that is still at least min_height tall,
+        so most of the downsampling happens during decode.
 
         Args:
-            image: Input image array (RGB format from TensorFlow)
+            image_bytes: Encoded (JPEG) image bytes
+            min_height: Optional minimum height of the decoded image
 
         Returns:
-            Downsampled image array (BGR format for OpenCV)
+            Decoded image array (BGR format for OpenCV)
         """
-        # Convert RGB to BGR for OpenCV
-        image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        original_height, original_width = image_bgr.shape[:2]
+        if _turbojpeg is not None:
+            scaling_factor = None
+            if min_height:
+                _, height, _, _ = _turbojpeg.decode_header(image_bytes)
+                scaling_factor = _select_scaling_factor(height, min_height)
+            return _turbojpeg.decode(image_bytes, pixel_format=TJPF_BGR,
+                                     scaling_factor=scaling_factor)
+
+        image = tf.io.decode_image(image_bytes).numpy()
+        return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+    def _target_width(self, image: np.ndarray) -> int:
+        """Width of image once scaled to target_height, keeping aspect ratio."""
+        original_height, original_width = image.shape[:2]
         aspect_ratio = original_width / original_height
-        target_width = int(self.target_height * aspect_ratio)
+        return int(self.target_height * aspect_ratio)
+
+    def downsample_image(self, image: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Downsample image to target height maintaining aspect ratio.
 
-        downsampled = cv2.resize(image_bgr, (target_width, self.target_height), interpolation=cv2.INTER_AREA)
+        Args:
+            image: Input image array (BGR format)
+            out: Optional destination array (or view) of the target shape to write into
+
+        Returns:
+            Downsampled image array (BGR format); out if given
+        """
+        original_height, original_width = image.shape[:2]
+        target_width = self._target_width(image)
+
+        # Already at target size (e.g. exact scaled decode), nothing left to resize
+        if original_height == self.target_height and original_width == target_width:
+            if out is None:
+                return image
+            np.copyto(out, image)
+            return out
+
+        downsampled = cv2.resize(image, (target_width, self.target_height), dst=out,
+                                 interpolation=cv2.INTER_AREA)
+        if out is not None and downsampled is not out:
+            # OpenCV allocated its own output instead of writing into the view
+            np.copyto(out, downsampled)
+            return out
         return downsampled
 
-    def encode_image_to_base64(self, image: np.ndarray) -> str:
+    def encode_image_to_jpeg(self, image: np.ndarray) -> Union[bytes, memoryview]:
         """
-        Encode image to base64 string.
+        Encode image to JPEG bytes.
 
         Args:
             image: Image array
 
         Returns:
-            Base64 encoded string
+            JPEG encoded bytes; with OpenCV, a memoryview of the encoder's output
+            buffer (no tobytes copy), usable wherever bytes are read
         """
-        # Encode to JPEG
-        success, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if _turbojpeg is not None:
+            # 4:2:0 chroma subsampling matches OpenCV's default output
+            return _turbojpeg.encode(np.ascontiguousarray(image), quality=self.jpeg_quality,
+                                     pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+
+        success, encoded = cv2.imencode('.jpg', image, self._jpeg_params)
         if not success:
             raise ValueError("Failed to encode image to JPEG")
+        return memoryview(encoded)
+
+    @staticmethod
+    def jpeg_to_base64(jpeg_bytes: Union[bytes, memoryview]) -> str:
+        """
+        Convert JPEG bytes to a base64 string.
+
+        Args:
+            jpeg_bytes: JPEG encoded bytes or a buffer holding them
+
+        Returns:
+            Base64 encoded string
+        """
+        return base64.b64encode(jpeg_bytes).decode('ascii')
+
+    def encode_image_to_base64(self, image: np.ndarray) -> str:
+        """
+        Encode image to base64 string.
+
+        Args:
+            image: Image array
 
-        # Convert to base64
-        base64_str = base64.b64encode(encoded.tobytes()).decode('utf-8')
-        return base64_str
+        Returns:
+            Base64 encoded string
+        """
+        return self.jpeg_to_base64(self.encode_image_to_jpeg(image))
 
-    def process_images_separate(self, frame: wod_e2ed_pb2.E2EDFrame) -> Optional[List[str]]:
+    def process_images_separate(self, frame: FrameView) -> Optional[List[bytes]]:
         """
-        Process images in separate mode (three separate base64 images).
+        Process images in separate mode (three separate JPEG images).
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
-            List of base64 encoded images [FRONT_LEFT, FRONT, FRONT_RIGHT] or None if failed
+            List of JPEG encoded images [FRONT_LEFT, FRONT, FRONT_RIGHT] or None if failed
         """
         images = self.extract_front_cameras(frame)
         if len(images) != 3:
             logger.warning("Could not extract all 3 front cameras")
             return None
 
-        base64_images = []
+        jpeg_images = []
         for image, camera_name in images:
             try:
                 downsampled = self.downsample_image(image)
-                base64_str = self.encode_image_to_base64(downsampled)
-                base64_images.append(base64_str)
+                jpeg_images.append(self.encode_image_to_jpeg(downsampled))
             except Exception as e:
-                logger.warning(f"Failed to process image for {camera_name}: {e}")
+                logger.warning("Failed to process image for %s: %s", camera_name, e)
                 return None
 
-        return base64_images
+        return jpeg_images
 
-    def process_images_concatenated(self, frame: wod_e2ed_pb2.E2EDFrame) -> Optional[str]:
+    def process_images_concatenated(self, frame: FrameView) -> Optional[bytes]:
         """
-        Process images in concatenated mode (one concatenated image).
+        Process images in concatenated mode (one concatenated JPEG image).
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
-            Base64 encoded concatenated image or None if failed
+            JPEG encoded concatenated image or None if failed
         """
         images = self.extract_front_cameras(frame)
         if len(images) != 3:
@@ -147,31 +258,34 @@ class ImageProcessor:
             return None
 
         try:
-            # Downsample each image
-            downsampled_images = []
-            for image, camera_name in images:
-                downsampled = self.downsample_image(image)
-                downsampled_images.append(downsampled)
-
-            # Concatenate horizontally (left-center-right)
-            concatenated = np.concatenate(downsampled_images, axis=1)
-
-            # Encode to base64
-            base64_str = self.encode_image_to_base64(concatenated)
-            return base64_str
+            # Downsample each image straight into its column range of one shared
+            # buffer (left-center-right) instead of concatenating afterwards
+            widths = [self._target_width(image) for image, _ in images]
+            shape = (self.target_height, sum(widths)) + images[0][0].shape[2:]
+            concatenated = self._concat_buffer
+            if concatenated is None or concatenated.shape != shape:
+                concatenated = self._concat_buffer = np.empty(shape, dtype=images[0][0].dtype)
+
+            x = 0
+            for (image, camera_name), width in zip(images, widths):
+                self.downsample_image(image, out=concatenated[:, x:x + width])
+                x += width
+
+            # Encode to JPEG
+            return self.encode_image_to_jpeg(concatenated)
         except Exception as e:
-            logger.warning(f"Failed to concatenate images: {e}")
+            logger.warning("Failed to concatenate images: %s", e)
             return None
 
-    def process_images(self, frame: wod_e2ed_pb2.E2EDFrame) -> Optional[List[str]]:
+    def process_images_jpeg(self, frame: FrameView) -> Optional[List[bytes]]:
         """
-        Process images according to configured mode.
+        Process images according to configured mode, returning raw JPEG bytes.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
-            List of base64 encoded images or None if failed
+            List of JPEG encoded images or None if failed
         """
         if self.input_mode == "separate":
             return self.process_images_separate(frame)
@@ -180,3 +294,48 @@ class ImageProcessor:
             return [concatenated] if concatenated else None
         else:
             raise ValueError(f"Unknown input_mode: {self.input_mode}")
+
+    def process_images(self, frame: FrameView) -> Optional[List[str]]:
+        """
+        Process images according to configured mode.
+
+        Args:
+            frame: FrameView
+
+        Returns:
+            List of base64 encoded images or None if failed
+        """
+        jpeg_images = self.process_images_jpeg(frame)
+        if not jpeg_images:
+            return None
+        return [self.jpeg_to_base64(jpeg) for jpeg in jpeg_images]
+
+
+def _init_encode_worker(target_height: int, input_mode: str, jpeg_quality: int):
+    """
+    Process pool initializer: build the worker's ImageProcessor.
+
+    Args:
+        target_height: Target height for downsampling
+        input_mode: "separate" or "concatenated"
+        jpeg_quality: JPEG quality for encoding (1-100)
+    """
+    global _worker_processor
+    # The pool already runs one frame per core; OpenCV's own threads would oversubscribe
+    cv2.setNumThreads(1)
+    _worker_processor = ImageProcessor(target_height, input_mode, jpeg_quality)
+
+
+def _encode_frame_images(frame: FrameView) -> Optional[List[bytes]]:
+    """
+    Process a frame's images in a pool worker (see _init_encode_worker).
+
+    Args:
+        frame: FrameView
+
+    Returns:
+        List of JPEG encoded images or None if failed
+    """
+    jpeg_images = _worker_processor.process_images_jpeg(frame)
+    # Results are pickled back to the parent, which memoryviews do not support
+    return [bytes(jpeg) for jpeg in jpeg_images] if jpeg_images else jpeg_images
@@ -0,0 +1,234 @@
+"""OneAPI VLM caller (Azure OpenAI-compatible chat completions endpoint)."""
+
+import asyncio
+import logging
+import os
+import base64
+from functools import lru_cache
+
+import httpx
+from openai import AzureOpenAI, AsyncAzureOpenAI
+
+logger = logging.getLogger(__name__)
+
+# OneAPI Configuration
+AZURE_API_BASE = "https://llm-proxy.perflab.nvidia.com"
+AZURE_API_VERSION = "2025-02-01-preview"
+
+# Available models configuration
+AVAILABLE_MODELS: list[str] = [
+    "gpt-4o-20241120",
+    "gemini-2.5-flash",
+    "gemini-3-pro",
+]
+
+
+# Connection pool size of the shared HTTP clients
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Async clients by (endpoint, API key, event loop); an httpx.AsyncClient cannot
+# be shared across event loops
+_async_clients: dict = {}
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str) -> AzureOpenAI:
+    """Shared client per API key, so connections are kept alive across calls"""
+    return AzureOpenAI(
+        api_key=api_key,
+        api_version=AZURE_API_VERSION,
+        azure_endpoint=AZURE_API_BASE,
+        http_client=httpx.Client(limits=HTTP_LIMITS),
+    )
+
+
+def _get_async_client(api_key: str) -> AsyncAzureOpenAI:
+    """Shared async client per API key on the running event loop"""
+    key = (AZURE_API_BASE, api_key, asyncio.get_running_loop())
+    client = _async_clients.get(key)
+    if client is None:
+        client = _async_clients[key] = AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version=AZURE_API_VERSION,
+            azure_endpoint=AZURE_API_BASE,
+            http_client=httpx.AsyncClient(limits=HTTP_LIMITS),
+        )
+    return client
+
+
+async def close_async_clients():
+    """Close the async clients created on the running event loop (call before it ends)"""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _async_clients if key[2] is loop]:
+        await _async_clients.pop(key).close()
+
+
+def encode_image_to_base64(image_path: str) -> str:
+    """Encode image to base64 string (cached until the file changes)"""
+    st = os.stat(image_path)
+    return _encode_file_to_base64(image_path, st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _encode_file_to_base64(image_path: str, mtime_ns: int, size: int) -> str:
+    """Read and base64-encode a file; mtime and size are part of the cache key"""
+    with open(image_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("ascii")
+
+
+def build_messages(
+    system_prompt: str,
+    user_prompt: str,
+    image_paths: list = None,
+    video_frames_base64: list = None,
+) -> list:
+    """
+    Build chat messages for a VLM request
+    
+    Args:
+        system_prompt: System prompt, either a string or prebuilt content blocks
+            (e.g. with cache_control markers, passed through unchanged)
+        user_prompt: User prompt
+        image_paths: List of image paths (optional)
+        video_frames_base64: List of pre-encoded video frames in base64 (optional)
+    
+    Returns:
+        Messages list for chat.completions.create
+    """
+    # Build user message content
+    content = [{"type": "text", "text": user_prompt}]
+    
+    # Add images if provided
+    if image_paths:
+        for img_path in image_paths:
+            img_b64 = encode_image_to_base64(img_path)
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{img_b64}",
+                    "detail": "high"  # or "low"
+                },
+            })
+    
+    # Add video frames if provided
+    if video_frames_base64:
+        for frame_b64 in video_frames_base64:
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{frame_b64}",
+                    "detail": "high"
+                },
+            })
+    
+    # Build complete messages
+    return [
+        {"role": "system", "content": (
+            [{"type": "text", "text": system_prompt}] if isinstance(system_prompt, str) else system_prompt
+        )},
+        {"role": "user", "content": content},
+    ]
+
+
+def _request_kwargs(temperature: float = None, prompt_cache_key: str = None) -> dict:
+    """Optional request arguments: sampling temperature and provider-side prompt caching"""
+    kwargs = {}
+    # Omitted unless set: some models degrade away from their default temperature
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    # Sent via extra_body so older SDK versions without the parameter still work
+    if prompt_cache_key:
+        kwargs["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+    return kwargs
+
+
+def _extract_response_text(response) -> str:
+    """Extract response text and log token usage (debug level)"""
+    response_text = ""
+    if response.choices and response.choices[0].message:
+        response_text = response.choices[0].message.content or ""
+    
+    # Extract token usage (optional)
+    usage = getattr(response, "usage", None)
+    if usage and logger.isEnabledFor(logging.DEBUG):
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        logger.debug("Token usage: prompt=%s, completion=%s", prompt_tokens, completion_tokens)
+    
+    return response_text
+
+
+def call_vlm_with_oneapi(
+    api_key: str,
+    model_name: str,
+    system_prompt: str,
+    user_prompt: str,
+    image_paths: list = None,
+    video_frames_base64: list = None,
+    prompt_cache_key: str = None,
+    temperature: float = None,
+    messages: list = None,
+):
+    """
+    Call VLM model using OneAPI
+    
+    Args:
+        api_key: OneAPI key
+        model_name: Model name, e.g., "gpt-4o-20241120" or "gemini-2.5-flash"
+        system_prompt: System prompt (string or prebuilt content blocks)
+        user_prompt: User prompt
+        image_paths: List of image paths (optional)
+        video_frames_base64: List of pre-encoded video frames in base64 (optional)
+        prompt_cache_key: Key shared by requests with the same static prefix, used by
+            the provider to route them to the same prompt cache (optional)
+        temperature: Sampling temperature (optional); None leaves the model's default
+        messages: Prebuilt messages from build_messages (optional); when given, the prompt
+            and image arguments are ignored, so retries can reuse one request body
+    
+    Returns:
+        VLM response text
+    """
+    client = _get_client(api_key)
+    
+    if messages is None:
+        messages = build_messages(system_prompt, user_prompt, image_paths, video_frames_base64)
+    
+    # Call API
+    response = client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        **_request_kwargs(temperature, prompt_cache_key),
+    )
+    
+    return _extract_response_text(response)
+
+
+async def call_vlm_with_oneapi_async(
+    api_key: str,
+    model_name: str,
+    system_prompt: str,
+    user_prompt: str,
+    image_paths: list = None,
+    video_frames_base64: list = None,
+    prompt_cache_key: str = None,
+    temperature: float = None,
+    messages: list = None,
+):
+    """
+    Call VLM model using OneAPI without blocking the event loop
+    
+    Same arguments and return value as call_vlm_with_oneapi; many calls can be
+    awaited concurrently (e.g. with asyncio.gather). Calls on one event loop share
+    a pooled client; await close_async_clients() before the loop ends.
+    """
+    if messages is None:
+        messages = build_messages(system_prompt, user_prompt, image_paths, video_frames_base64)
+    
+    client = _get_async_client(api_key)
+    response = await client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        **_request_kwargs(temperature, prompt_cache_key),
+    )
+    
+    return _extract_response_text(response)
@@ -3,18 +3,122 @@
 import json
 import logging
 import base64
+import os
 from pathlib import Path
-from typing import Dict, Any, Set, Optional, List
+from typing import Dict, Any, Set, Optional, List, Tuple, Iterator
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Name of the append-only results file used when results_format is "jsonl"
+RESULTS_JSONL_FILE = "results.jsonl"
+
+# Write buffer for the JSONL results file (bytes)
+RESULTS_JSONL_BUFFER_SIZE = 1 << 20
+
+# The checkpoint log is fsynced on every Nth append_checkpoint call
+CHECKPOINT_LOG_FSYNC_INTERVAL = 10
+
+# The checkpoint log is compacted once it holds this many lines per unique frame
+CHECKPOINT_LOG_COMPACT_RATIO = 2
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert numpy arrays and scalars for the stdlib json fallback."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def checkpoint_log_path(checkpoint_path) -> Path:
+    """Path of the append-only checkpoint log kept next to a checkpoint file."""
+    return Path(checkpoint_path).with_suffix('.log')
+
+
+def read_checkpoint_log(path, offset: int = 0) -> Tuple[List[str], int]:
+    """
+    Read the frame names appended to a checkpoint log.
+
+    Only complete lines are returned; a partial trailing line (from an
+    interrupted write) is left for the next read.
+
+    Args:
+        path: Checkpoint log path
+        offset: Byte offset to resume reading from (0 reads the whole log)
+
+    Returns:
+        (frame names, offset just past the last complete line); ([], offset) if
+        the log does not exist
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+    end = data.rfind(b'\n') + 1
+    return data[:end].decode('utf-8').splitlines(), offset + end
+
+
+def iter_jsonl_results(path) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Decode a JSONL results file line by line.
+
+    Args:
+        path: results.jsonl path (a missing file yields nothing)
+
+    Yields:
+        (result, None) for each decoded line, or (None, error message) for a
+        line that does not decode
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield loads(line), None
+            except ValueError as e:
+                yield None, f"Failed to load {path} line {line_number}: {e}"
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when available.
+
+    numpy arrays (e.g. trajectories) are serialized natively by orjson, without
+    an intermediate Python list.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False,
+                      default=_json_default).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class OutputHandler:
     """Handler for saving results and managing checkpoints."""
 
     def __init__(self, output_dir: str, results_subdir: str = "results",
-                 checkpoint_file: str = "checkpoint.json", save_images: bool = False):
+                 checkpoint_file: str = "checkpoint.json", save_images: bool = False,
+                 results_format: str = "json"):
         """
         Initialize output handler.
 
@@ -23,12 +127,31 @@ class OutputHandler:
             results_subdir: Subdirectory for individual frame results
             checkpoint_file: Checkpoint file name
             save_images: Whether to save images to disk
+            results_format: "json" for one file per frame, or "jsonl" to append all
+                results to a single results.jsonl (flushed on each checkpoint)
         """
+        if results_format not in ("json", "jsonl"):
+            raise ValueError(f"Unknown results_format: {results_format}")
+
         self.output_dir = Path(output_dir)
         self.results_dir = self.output_dir / results_subdir
         self.images_dir = self.output_dir / "images"
         self.checkpoint_path = self.output_dir / checkpoint_file
+        # Append-only log of frames processed since the last full checkpoint
+        self.checkpoint_log_path = checkpoint_log_path(self.checkpoint_path)
         self.save_images = save_images
+        self.results_format = results_format
+        self.results_jsonl_path = self.results_dir / RESULTS_JSONL_FILE
+        self._results_fp = None
+        self._jsonl_frames: Optional[Set[str]] = None
+        self._checkpoint_log_fp = None
+        self._checkpoint_log_names: Dict[str, None] = {}
+        self._checkpoint_log_lines = 0
+        self._checkpoint_appends = 0
+
+        # processing_timestamp stamped on results; refreshed on every checkpoint
+        # rather than per frame
+        self._batch_timestamp = datetime.now().isoformat()
 
         # Create directories
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -36,14 +159,68 @@ class OutputHandler:
         if self.save_images:
             self.images_dir.mkdir(parents=True, exist_ok=True)
 
-    def _save_images(self, frame_name: str, images_base64: List[str],
+        if self.results_format == "jsonl":
+            # Index existing results up front, so has_result is a plain set
+            # lookup that the pipeline's prefetch thread can call safely
+            self._jsonl_frames = self._load_jsonl_frame_names()
+            self._results_fp = open(self.results_jsonl_path, 'ab',
+                                    buffering=RESULTS_JSONL_BUFFER_SIZE)
+
+    def has_result(self, frame_name: str) -> bool:
+        """
+        Check whether a result has already been written for a frame.
+
+        Args:
+            frame_name: Unique frame identifier
+
+        Returns:
+            True if a result exists for the frame
+        """
+        if self.results_format == "json":
+            return (self.results_dir / f"{frame_name}.json").exists()
+        return frame_name in self._jsonl_frames
+
+    def _load_jsonl_frame_names(self) -> Set[str]:
+        """Collect frame names of results already present in results.jsonl."""
+        frame_names = set()
+        try:
+            with open(self.results_jsonl_path, 'rb') as f:
+                for line in f:
+                    try:
+                        frame_names.add(_loads(line)["metadata"]["frame_name"])
+                    except (ValueError, KeyError, TypeError):
+                        # Partial trailing line from an interrupted run
+                        continue
+        except FileNotFoundError:
+            pass
+        return frame_names
+
+    def flush(self):
+        """Flush buffered JSONL results to disk."""
+        if self._results_fp is not None:
+            self._results_fp.flush()
+
+    def close(self):
+        """Flush and close the JSONL results file and the checkpoint log, if open."""
+        if self._results_fp is not None:
+            self._results_fp.close()
+            self._results_fp = None
+        self._close_checkpoint_log()
+
+    def _close_checkpoint_log(self):
+        """Close the checkpoint log, if open."""
+        if self._checkpoint_log_fp is not None:
+            self._checkpoint_log_fp.close()
+            self._checkpoint_log_fp = None
+
+    def _save_images(self, frame_name: str, images_jpeg: List[bytes],
                      image_names: List[str]) -> List[str]:
         """
-        Save base64 encoded images to disk.
+        Save JPEG images to disk.
 
         Args:
             frame_name: Unique frame identifier
-            images_base64: List of base64 encoded images
+            images_jpeg: List of JPEG encoded images
             image_names: List of image names (e.g., ["front_left", "front", "front_right"])
 
         Returns:
@@ -53,11 +230,8 @@ class OutputHandler:
         frame_images_dir.mkdir(parents=True, exist_ok=True)
 
         image_paths = []
-        for img_base64, img_name in zip(images_base64, image_names):
+        for img_bytes, img_name in zip(images_jpeg, image_names):
             try:
-                # Decode base64 to bytes
-                img_bytes = base64.b64decode(img_base64)
-
                 # Save image
                 img_filename = f"{img_name}.jpg"
                 img_path = frame_images_dir / img_filename
@@ -69,7 +243,7 @@ class OutputHandler:
                 image_paths.append(relative_path)
 
             except Exception as e:
-                logger.warning(f"Failed to save image {img_name} for frame {frame_name}: {e}")
+                logger.warning("Failed to save image %s for frame %s: %s", img_name, frame_name, e)
                 image_paths.append(None)
 
         return image_paths
@@ -78,7 +252,8 @@ class OutputHandler:
                     input_data: Dict[str, Any], vlm_response: Dict[str, Any],
                     token_usage: Optional[Dict[str, int]] = None,
                     images_base64: Optional[List[str]] = None,
-                    image_names: Optional[List[str]] = None):
+                    image_names: Optional[List[str]] = None,
+                    images_jpeg: Optional[List[bytes]] = None):
         """
         Save processing result for a frame.
 
@@ -89,12 +264,14 @@ class OutputHandler:
             vlm_response: VLM response
             token_usage: Token usage statistics
             images_base64: Optional list of base64 encoded images to save
-            image_names: Optional list of image names corresponding to images_base64
+            image_names: Optional list of image names corresponding to the images
+            images_jpeg: Optional list of raw JPEG images to save; preferred over
+                images_base64 since it avoids a base64 decode
         """
         result = {
             "metadata": {
                 "frame_name": frame_name,
-                "processing_timestamp": datetime.now().isoformat(),
+                "processing_timestamp": self._batch_timestamp,
                 **metadata
             },
             "input_data": input_data,
@@ -105,67 +282,176 @@ class OutputHandler:
             result["token_usage"] = token_usage
 
         # Save images if enabled
-        if self.save_images and images_base64 and image_names:
-            image_paths = self._save_images(frame_name, images_base64, image_names)
+        if self.save_images and images_base64 and not images_jpeg:
+            images_jpeg = [base64.b64decode(img_base64) for img_base64 in images_base64]
+        if self.save_images and images_jpeg and image_names:
+            image_paths = self._save_images(frame_name, images_jpeg, image_names)
             result["image_paths"] = image_paths
 
+        if self.results_format == "jsonl":
+            try:
+                self._results_fp.write(_dumps(result) + b"\n")
+                self._jsonl_frames.add(frame_name)
+                logger.debug("Appended result for %s to %s", frame_name, self.results_jsonl_path)
+            except Exception as e:
+                logger.error("Failed to append result for %s: %s", frame_name, e)
+                raise
+            return
+
         # Generate output filename
         output_file = self.results_dir / f"{frame_name}.json"
 
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Saved result to {output_file}")
+            with open(output_file, 'wb') as f:
+                f.write(_dumps(result, indent=True))
+            logger.debug("Saved result to %s", output_file)
         except Exception as e:
-            logger.error(f"Failed to save result to {output_file}: {e}")
+            logger.error("Failed to save result to %s: %s", output_file, e)
             raise
 
-    def load_checkpoint(self) -> Set[str]:
+    def load_checkpoint(self) -> Dict[str, None]:
         """
         Load processed frame names from checkpoint.
 
+        The full checkpoint is read first, followed by the frames appended to
+        the checkpoint log since it was written.
+
         Returns:
-            Set of processed frame names
+            Processed frame names as an insertion-ordered set (dict keys),
+            in the order they were checkpointed
         """
-        if not self.checkpoint_path.exists():
-            return set()
+        processed_frames = {}
+
+        if self.checkpoint_path.exists():
+            try:
+                with open(self.checkpoint_path, 'rb') as f:
+                    checkpoint = _loads(f.read())
+                processed_frames = dict.fromkeys(checkpoint.get("processed_frames", []))
+            except Exception as e:
+                logger.warning("Failed to load checkpoint: %s", e)
 
         try:
-            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-            processed_frames = set(checkpoint.get("processed_frames", []))
-            logger.info(f"Loaded checkpoint with {len(processed_frames)} processed frames")
-            return processed_frames
+            frame_names, _ = read_checkpoint_log(self.checkpoint_log_path)
+            processed_frames.update(dict.fromkeys(frame_names))
+            self._checkpoint_log_names.update(dict.fromkeys(frame_names))
+            self._checkpoint_log_lines += len(frame_names)
         except Exception as e:
-            logger.warning(f"Failed to load checkpoint: {e}")
-            return set()
+            logger.warning("Failed to load checkpoint log: %s", e)
+
+        if processed_frames:
+            logger.info("Loaded checkpoint with %s processed frames", len(processed_frames))
+        return processed_frames
 
-    def save_checkpoint(self, processed_frames: Set[str]):
+    def append_checkpoint(self, frame_names: List[str]):
+        """
+        Append newly processed frames to the checkpoint log.
+
+        Only the frames processed since the previous call are written, so each
+        checkpoint costs O(interval) rather than O(total processed). The log is
+        fsynced every CHECKPOINT_LOG_FSYNC_INTERVAL calls and compacted once
+        duplicates make it CHECKPOINT_LOG_COMPACT_RATIO times the unique count.
+        Readers of the checkpoint (resume, monitor.py, cleanup.py) replay the
+        log on top of the JSON checkpoint.
+
+        Args:
+            frame_names: Frame names processed since the last checkpoint
+        """
+        self._checkpoint_appends += 1
+        sync = self._checkpoint_appends % CHECKPOINT_LOG_FSYNC_INTERVAL == 0
+
+        # JSONL results are fsynced before the log entries claiming them are even
+        # written, so the log can never reach disk ahead of the results
+        if self._results_fp is not None:
+            self._results_fp.flush()
+            os.fsync(self._results_fp.fileno())
+
+        self._batch_timestamp = datetime.now().isoformat()
+        if not frame_names:
+            return
+
+        try:
+            if self._checkpoint_log_fp is None:
+                self._checkpoint_log_fp = open(self.checkpoint_log_path, 'a', encoding='utf-8')
+            self._checkpoint_log_fp.write('\n'.join(frame_names) + '\n')
+            self._checkpoint_log_fp.flush()
+            if sync:
+                os.fsync(self._checkpoint_log_fp.fileno())
+            logger.debug("Appended %s frames to checkpoint log", len(frame_names))
+        except Exception as e:
+            logger.error("Failed to append to checkpoint log: %s", e)
+            raise
+
+        self._checkpoint_log_names.update(dict.fromkeys(frame_names))
+        self._checkpoint_log_lines += len(frame_names)
+        if self._checkpoint_log_lines > CHECKPOINT_LOG_COMPACT_RATIO * len(self._checkpoint_log_names):
+            self._compact_checkpoint_log()
+
+    def _compact_checkpoint_log(self):
+        """Rewrite the checkpoint log without duplicate frame names."""
+        self._close_checkpoint_log()
+        names = list(self._checkpoint_log_names)
+        self._write_atomic(self.checkpoint_log_path,
+                           ''.join(name + '\n' for name in names).encode('utf-8'))
+        self._checkpoint_log_lines = len(names)
+        logger.debug("Compacted checkpoint log to %s frames", len(names))
+
+    def _write_atomic(self, path: Path, data: bytes):
+        """
+        Write data to a temporary file, fsync it, then rename it over path.
+
+        Args:
+            path: Destination path; readers only ever see a complete file
+            data: File contents
+        """
+        temp_path = os.fspath(path.with_name(path.name + '.tmp'))
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(temp_path, path)
+
+    def save_checkpoint(self, processed_frames: Dict[str, None]):
         """
         Save checkpoint of processed frames with ordering preserved.
 
+        This writes the full set and folds the checkpoint log into it; use
+        append_checkpoint for the periodic checkpoints of a run.
+
         Args:
-            processed_frames: Set of processed frame names
+            processed_frames: Processed frame names as an insertion-ordered set (dict keys)
         """
-        # Keep frames in insertion order (ordered list instead of sorted)
-        # This preserves the actual processing order
+        # Results must be durably on disk before the checkpoint claims them as processed
+        if self._results_fp is not None:
+            self._results_fp.flush()
+            os.fsync(self._results_fp.fileno())
+
+        # Keep frames in insertion order (ordered list instead of sorted).
+        # The dict preserves the actual processing order, so this is an O(N) copy.
         frames_list = list(processed_frames)
 
+        self._batch_timestamp = datetime.now().isoformat()
         checkpoint = {
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": self._batch_timestamp,
             "total_processed": len(processed_frames),
             "processed_frames": frames_list
         }
 
         try:
-            # Write to temporary file first, then rename (atomic operation)
-            temp_path = self.checkpoint_path.with_suffix('.tmp')
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint, f, indent=2)
-            temp_path.replace(self.checkpoint_path)
-            logger.debug(f"Saved checkpoint with {len(processed_frames)} frames")
+            # Write compact JSON atomically so readers only ever see a complete file
+            self._write_atomic(self.checkpoint_path, _dumps(checkpoint))
+            logger.debug("Saved checkpoint with %s frames", len(processed_frames))
+
+            # Every logged frame is now in the full checkpoint
+            self._close_checkpoint_log()
+            self.checkpoint_log_path.unlink(missing_ok=True)
+            self._checkpoint_log_names = {}
+            self._checkpoint_log_lines = 0
         except Exception as e:
-            logger.error(f"Failed to save checkpoint: {e}")
+            logger.error("Failed to save checkpoint: %s", e)
             raise
 
     def generate_summary(self, total_frames: int, processed_frames: int,
@@ -194,11 +480,11 @@ class OutputHandler:
         # Save summary
         summary_path = self.output_dir / "summary.json"
         try:
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2)
-            logger.info(f"Saved summary to {summary_path}")
+            with open(summary_path, 'wb') as f:
+                f.write(_dumps(summary, indent=True))
+            logger.info("Saved summary to %s", summary_path)
         except Exception as e:
-            logger.warning(f"Failed to save summary: {e}")
+            logger.warning("Failed to save summary: %s", e)
 
         return summary
 
@@ -226,8 +512,8 @@ class OutputHandler:
 
         log_path = self.output_dir / "processing_order.json"
         try:
-            with open(log_path, 'w', encoding='utf-8') as f:
-                json.dump(log_data, f, indent=2)
-            logger.info(f"Saved processing order log to {log_path} ({len(frame_names)} frames)")
+            with open(log_path, 'wb') as f:
+                f.write(_dumps(log_data, indent=True))
+            logger.info("Saved processing order log to %s (%s frames)", log_path, len(frame_names))
         except Exception as e:
-            logger.warning(f"Failed to save processing order log: {e}")
+            logger.warning("Failed to save processing order log: %s", e)
@@ -1,10 +1,76 @@
 """Prompt builder for VLM input."""
 
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any
+import string
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Per-frame part of the prompt
+_SUFFIX_FORMAT = (
+    "Current intent: {intent}\n"
+    "Past trajectory (4 seconds, 16 points at 4Hz):\n{past}\n\n"
+    "Future trajectory (5 seconds, 20 points at 4Hz):\n{future}\n"
+)
+
+
+def _split_format(fmt: str) -> Tuple[List[str], Tuple[str, ...]]:
+    """
+    Pre-split a format string into literal parts and field names.
+
+    Args:
+        fmt: str.format style string with plain {name} fields
+
+    Returns:
+        (parts, slots) with len(parts) == len(slots) + 1, so the rendered string is
+        parts[0] + value(slots[0]) + parts[1] + ... + parts[-1]
+    """
+    parts = [""]
+    slots = []
+    for literal, field_name, _, _ in string.Formatter().parse(fmt):
+        parts[-1] += literal
+        if field_name is not None:
+            slots.append(field_name)
+            parts.append("")
+    return parts, tuple(slots)
+
+
+_SUFFIX_PARTS, _SUFFIX_SLOTS = _split_format(_SUFFIX_FORMAT)
+
+
+def _render(parts: List[str], slots: Tuple[str, ...], fields: Dict[str, str]) -> str:
+    """Join pre-split parts with the field values in one str.join."""
+    pieces = [parts[0]]
+    for slot, part in zip(slots, parts[1:]):
+        pieces.append(fields[slot])
+        pieces.append(part)
+    return "".join(pieces)
+
+
+def _trajectory_json(trajectory) -> str:
+    """
+    Serialize a trajectory as a compact JSON array of [x, y, z] points.
+
+    Args:
+        trajectory: List of [x, y, z] coordinates (or an (N, 3) array)
+
+    Returns:
+        JSON text with coordinates rounded to 2 decimals
+    """
+    points = np.round(np.asarray(trajectory, dtype=np.float64), 2)
+    if orjson is not None:
+        return orjson.dumps(points, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(points.tolist(), separators=(',', ':'))
+
 
 class PromptBuilder:
     """Builder for VLM prompts."""
@@ -18,6 +84,12 @@ class PromptBuilder:
         """
         self.prompt_template_path = prompt_template_path
         self.template = self._load_template()
+        # Stable identifier for the static prefix, lets the provider route requests
+        # sharing it to the same prompt cache
+        self.cache_key = hashlib.blake2b(self.template.encode('utf-8'), digest_size=8).hexdigest()
+        # Full prompt pre-split around the per-frame fields; the template goes in
+        # verbatim, so braces in its JSON example need no escaping
+        self._prompt_parts = [self.template + "\n\n" + _SUFFIX_PARTS[0], *_SUFFIX_PARTS[1:]]
 
     def _load_template(self) -> str:
         """Load prompt template from file."""
@@ -25,53 +97,63 @@ class PromptBuilder:
             with open(self.prompt_template_path, 'r', encoding='utf-8') as f:
                 return f.read()
         except Exception as e:
-            logger.warning(f"Failed to load prompt template: {e}")
+            logger.warning("Failed to load prompt template: %s", e)
             return self._get_default_template()
 
     def _get_default_template(self) -> str:
         """Get default prompt template."""
         return """You are an expert labeller of driving scenarios. Input: - 3 frames of multi-view images collected from the ego-vehicle over the last 1 second - Current high-level intent (string) - 4-second past trajectory (16 steps at 4 Hz) - Expert 5-second future trajectory (20 steps at 4 Hz) Task: 1. Inspect the input and decide, for each object class below, whether at least one critical instance of that class is present (i.e., it materially affects the ego-vehicle's future trajectory). A vehicle can be a car, bus, truck, motorcyclist, scooter, etc. traffic_element includes traffic signs and traffic lights. road_hazard may include hazardous road conditions, road debris, obstacles, etc. A conflicting_vehicle is a vehicle that may potentially conflict with the ego's future path. Object classes to audit: - nearby_vehicle - pedestrian - cyclist - construction - traffic_element - weather_condition - road_hazard - emergency_vehicle - animal - special_vehicle - conflicting_vehicle - door_opening_vehicle 2. Output "yes" or "no" for every class (no omissions). 3. Compose a concise natural-language description explaining why the expert safe driver plans the given future trajectory. - Mention only the classes you marked "yes" - Describe how each of those critical objects or conditions influences the trajectory. - Do not invent objects or conditions not present in the input. 4. From the expert's 5-second future trajectory, assign exactly one category from each list: - speed ∈ { keep, accelerate, decelerate } - command ∈ { straight, yield, left_turn, right_turn, lane_follow, lane_change_left, lane_change_right, reverse } Choose the label that best summarises the overall behaviour of the expert future trajectory. - If none fits, use 'other', but do this sparingly. Output format (strict JSON, no extra keys, no commentary): {  "critical_objects": { "nearby_vehicle": "yes | no", "pedestrian": "yes | no", "cyclist": "yes | no", "construction": "yes | no", "traffic_element": "yes | no", "weather_condition": "yes | no", "road_hazard": "yes | no", "emergency_vehicle": "yes | no", "animal": "yes | no", "special_vehicle": "yes | no", "conflicting_vehicle": "yes | no", "door_opening_vehicle": "yes | no" }, "explanation": "100-word description that references only the classes marked 'yes'", "meta_behaviour": { "speed": "keep | accelerate | decelerate | other", "command": "straight | yield | left_turn | right_turn | lane_follow | lane_change_left | lane_change_right | reverse | other"}}"""
 
-    def build_prompt(self, trajectory_data: Dict[str, Any]) -> str:
+    def build_system_block(self, system_prompt: str, cacheable: bool = False) -> List[Dict[str, Any]]:
         """
-        Build VLM prompt from trajectory data.
+        Build the static system message content.
+
+        The template never changes between frames, so it is sent as its own
+        system block; when marked cacheable, providers with prefix caching then
+        only prefill the short per-frame suffix after the first request.
 
         Args:
-            trajectory_data: Dictionary with past_trajectory, future_trajectory, and ego_status
+            system_prompt: System prompt from config
+            cacheable: Add a cache_control marker to the template block (only
+                for endpoints that accept it; others reject the request)
 
         Returns:
-            Formatted prompt string
+            Content blocks for the system message
         """
-        past_traj = trajectory_data.get("past_trajectory", [])
-        future_traj = trajectory_data.get("future_trajectory", [])
-        ego_status = trajectory_data.get("ego_status", {})
+        template_block = {"type": "text", "text": self.template}
+        if cacheable:
+            template_block["cache_control"] = {"type": "ephemeral"}
+        return [{"type": "text", "text": system_prompt}, template_block]
 
-        # Format trajectories as text
-        past_traj_text = self._format_trajectory(past_traj)
-        future_traj_text = self._format_trajectory(future_traj)
-        intent = ego_status.get("intent", "UNKNOWN")
+    def build_user_suffix(self, trajectory_data: Dict[str, Any]) -> str:
+        """
+        Build the per-frame part of the prompt (intent and trajectories only).
 
-        # Build prompt with trajectory information
-        prompt = self.template + "\n\n"
-        prompt += f"Current intent: {intent}\n"
-        prompt += f"Past trajectory (4 seconds, 16 points at 4Hz):\n{past_traj_text}\n\n"
-        prompt += f"Future trajectory (5 seconds, 20 points at 4Hz):\n{future_traj_text}\n"
+        Args:
+            trajectory_data: Dictionary with past_trajectory, future_trajectory, and ego_status
 
-        return prompt
+        Returns:
+            Formatted per-frame prompt string
+        """
+        return _render(_SUFFIX_PARTS, _SUFFIX_SLOTS, self._suffix_fields(trajectory_data))
 
-    def _format_trajectory(self, trajectory: List[List[float]]) -> str:
+    def build_prompt(self, trajectory_data: Dict[str, Any]) -> str:
         """
-        Format trajectory as readable text.
+        Build the full VLM prompt (template followed by the per-frame suffix).
 
         Args:
-            trajectory: List of [x, y, z] coordinates
+            trajectory_data: Dictionary with past_trajectory, future_trajectory, and ego_status
 
         Returns:
-            Formatted text string
+            Formatted prompt string
         """
-        if not trajectory:
-            return "[]"
+        return _render(self._prompt_parts, _SUFFIX_SLOTS, self._suffix_fields(trajectory_data))
 
-        # Format as list of tuples with limited precision
-        formatted_points = [f"({p[0]:.2f}, {p[1]:.2f}, {p[2]:.2f})" for p in trajectory]
-        return "[" + ", ".join(formatted_points) + "]"
+    def _suffix_fields(self, trajectory_data: Dict[str, Any]) -> Dict[str, str]:
+        """Format the per-frame prompt fields (intent, past, future) as text."""
+        ego_status = trajectory_data.get("ego_status", {})
+        return {
+            "intent": ego_status.get("intent", "UNKNOWN"),
+            "past": _trajectory_json(trajectory_data.get("past_trajectory", [])),
+            "future": _trajectory_json(trajectory_data.get("future_trajectory", [])),
+        }
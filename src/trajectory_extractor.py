@@ -1,23 +1,45 @@
 """Trajectory extractor for Waymo E2E dataset."""
 
+import math
 import numpy as np
 import logging
 from typing import List, Tuple, Dict, Any
-from waymo_open_dataset.protos import end_to_end_driving_data_pb2 as wod_e2ed_pb2
+
+from .frame_view import FrameView, StatesView
 
 logger = logging.getLogger(__name__)
 
-# Intent mapping
-INTENT_MAP = {
-    0: "UNKNOWN",
-    1: "GO_STRAIGHT",
-    2: "GO_LEFT",
-    3: "GO_RIGHT",
-}
+# Intent names indexed by the E2EDFrame intent enum value
+INTENTS = ("UNKNOWN", "GO_STRAIGHT", "GO_LEFT", "GO_RIGHT")
+INTENT_MAP = dict(enumerate(INTENTS))
+
+
+def _states_to_points(states: StatesView) -> np.ndarray:
+    """
+    Stack state position arrays into [x, y, z] points in one numpy pass.
+
+    The array is kept as is (no tolist): the prompt builder and the output
+    handler serialize it directly through orjson's numpy support.
+
+    Args:
+        states: StatesView
+
+    Returns:
+        (N, 3) float64 array of [x, y, z] coordinates, one per pos_x entry
+        Note: z defaults to 0 where pos_z is not populated
+    """
+    num_points = len(states.pos_x)
+    points = np.zeros((num_points, 3), dtype=np.float64)
+    points[:, 0] = states.pos_x
+    points[:, 1] = states.pos_y
+    # pos_z is optional in the dataset and may be shorter (or empty)
+    pos_z = states.pos_z[:num_points]
+    points[:len(pos_z), 2] = pos_z
+    return points
 
 
 class TrajectoryExtractor:
-    """Extractor for trajectories and ego status from E2EDFrame."""
+    """Extractor for trajectories and ego status from a FrameView."""
 
     def __init__(self, past_duration_seconds: int = 4, past_frequency_hz: int = 4,
                  future_duration_seconds: int = 5, future_frequency_hz: int = 4):
@@ -38,58 +60,38 @@ class TrajectoryExtractor:
         self.expected_past_points = past_duration_seconds * past_frequency_hz
         self.expected_future_points = future_duration_seconds * future_frequency_hz
 
-    def extract_past_trajectory(self, frame: wod_e2ed_pb2.E2EDFrame) -> List[List[float]]:
+    def extract_past_trajectory(self, frame: FrameView) -> np.ndarray:
         """
         Extract past trajectory.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
-            List of [x, y, z] coordinates (16 points for 4 seconds at 4Hz)
+            (N, 3) array of [x, y, z] coordinates (16 points for 4 seconds at 4Hz)
             Note: z defaults to 0 if not populated in the dataset
         """
-        past_states = frame.past_states
-        trajectory = []
+        return _states_to_points(frame.past_states)
 
-        for i in range(len(past_states.pos_x)):
-            x = float(past_states.pos_x[i])
-            y = float(past_states.pos_y[i])
-            # pos_z is optional in the dataset, default to 0 if not available
-            z = float(past_states.pos_z[i]) if i < len(past_states.pos_z) else 0.0
-            trajectory.append([x, y, z])
-
-        return trajectory
-
-    def extract_future_trajectory(self, frame: wod_e2ed_pb2.E2EDFrame) -> List[List[float]]:
+    def extract_future_trajectory(self, frame: FrameView) -> np.ndarray:
         """
         Extract future trajectory.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
-            List of [x, y, z] coordinates (20 points for 5 seconds at 4Hz)
+            (N, 3) array of [x, y, z] coordinates (20 points for 5 seconds at 4Hz)
             Note: z defaults to 0 if not populated in the dataset
         """
-        future_states = frame.future_states
-        trajectory = []
+        return _states_to_points(frame.future_states)
 
-        for i in range(len(future_states.pos_x)):
-            x = float(future_states.pos_x[i])
-            y = float(future_states.pos_y[i])
-            # pos_z is optional in the dataset, default to 0 if not available
-            z = float(future_states.pos_z[i]) if i < len(future_states.pos_z) else 0.0
-            trajectory.append([x, y, z])
-
-        return trajectory
-
-    def extract_ego_status(self, frame: wod_e2ed_pb2.E2EDFrame) -> Dict[str, Any]:
+    def extract_ego_status(self, frame: FrameView) -> Dict[str, Any]:
         """
         Extract ego vehicle status.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
             Dictionary with velocity, speed, and intent
@@ -101,14 +103,15 @@ class TrajectoryExtractor:
         vel_y = float(past_states.vel_y[-1]) if past_states.vel_y else 0.0
 
         # Calculate speed
-        speed = np.sqrt(vel_x ** 2 + vel_y ** 2)
+        speed = math.hypot(vel_x, vel_y)
 
         # Get intent
-        intent = INTENT_MAP.get(frame.intent, "UNKNOWN")
+        intent = frame.intent
+        intent = INTENTS[intent] if 0 <= intent < len(INTENTS) else "UNKNOWN"
 
         return {
             "velocity": [vel_x, vel_y],
-            "speed": float(speed),
+            "speed": speed,
             "intent": intent,
         }
 
@@ -117,21 +120,24 @@ class TrajectoryExtractor:
         Format trajectory as text string.
 
         Args:
-            trajectory: List of [x, y, z] coordinates
+            trajectory: List of [x, y, z] coordinates (or an (N, 3) array)
 
         Returns:
             Formatted text string
         """
+        # Plain floats, so numpy scalar reprs don't leak into the text
+        if isinstance(trajectory, np.ndarray):
+            trajectory = trajectory.tolist()
         # Format as list of tuples
         formatted = str([tuple(point) for point in trajectory])
         return formatted
 
-    def validate_frame(self, frame: wod_e2ed_pb2.E2EDFrame) -> Tuple[bool, str]:
+    def validate_frame(self, frame: FrameView) -> Tuple[bool, str]:
         """
         Validate if a frame has complete trajectory data.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
             Tuple of (is_valid, error_message)
@@ -139,6 +145,11 @@ class TrajectoryExtractor:
         past_states = frame.past_states
         future_states = frame.future_states
 
+        # Fast path for the common valid frame; error details are only built below
+        if (len(past_states.pos_x) == len(past_states.pos_y) == self.expected_past_points
+                and len(future_states.pos_x) == len(future_states.pos_y) == self.expected_future_points):
+            return True, ""
+
         # Check past trajectory
         past_x_len = len(past_states.pos_x)
         past_y_len = len(past_states.pos_y)
@@ -171,12 +182,12 @@ class TrajectoryExtractor:
 
         return True, ""
 
-    def extract_all(self, frame: wod_e2ed_pb2.E2EDFrame) -> Dict[str, Any]:
+    def extract_all(self, frame: FrameView) -> Dict[str, Any]:
         """
         Extract all trajectory and status information.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView
 
         Returns:
             Dictionary with past_trajectory, future_trajectory, and ego_status
@@ -1,20 +1,43 @@
 """Utility functions for the pipeline."""
 
+import importlib
+import importlib.util
 import logging
+import os
+import queue
 import sys
+import types
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
+
+# Set WAYMO_EAGER_IMPORT=1 to import heavy dependencies up front (e.g. in CI, so a
+# broken import fails at startup instead of on first use)
+EAGER_IMPORT = os.environ.get("WAYMO_EAGER_IMPORT") == "1"
+
+# Log file rotation
+LOG_MAX_BYTES = 50_000_000
+LOG_BACKUP_COUNT = 5
 
 
 def setup_logging(log_file: str, level: str = "INFO", console_output: bool = True,
-                  file_output: bool = True):
+                  file_output: bool = True) -> Optional[QueueListener]:
     """
     Setup logging configuration.
 
+    Records are put on a queue by the logging call and written to the console
+    and log file by a background listener thread, so pipeline threads never
+    block on log I/O.
+
     Args:
         log_file: Path to log file
         level: Logging level
         console_output: Whether to output to console
         file_output: Whether to output to file
+
+    Returns:
+        The started QueueListener (call stop() on shutdown to flush it), or None
+        if no output is enabled
     """
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, level))
@@ -24,19 +47,58 @@ def setup_logging(log_file: str, level: str = "INFO", console_output: bool = Tru
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+    handlers = []
+
     # Console handler
     if console_output:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # File handler
     if file_output:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_path)
+        file_handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES,
+                                           backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if not handlers:
+        return None
+
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Import a module lazily: it is executed on first attribute access.
+
+    The module is located immediately, so a missing dependency still raises
+    ImportError at the import site. Imports eagerly when WAYMO_EAGER_IMPORT=1.
+
+    Args:
+        name: Fully qualified module name
+
+    Returns:
+        The module, or a lazy module object that loads on first use
+    """
+    if name in sys.modules or EAGER_IMPORT:
+        return importlib.import_module(name)
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
 
 
 def validate_config(config) -> bool:
@@ -1,20 +1,171 @@
 """VLM API client with retry logic."""
 
+import asyncio
+import hashlib
 import logging
+import random
+import re
+import sqlite3
+import threading
 import time
 import json
-from typing import Optional, Dict, Any
-import sys
-import os
+from typing import Optional, Dict, Any, List, Sequence, Tuple, Union
+
+import openai
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .oneapi_caller import (
+    build_messages, call_vlm_with_oneapi, call_vlm_with_oneapi_async, close_async_clients,
+)
 
 logger = logging.getLogger(__name__)
 
+# Keys a VLM response must contain
+_REQUIRED_TOP = frozenset(("critical_objects", "explanation", "meta_behaviour"))
+_REQUIRED_OBJECTS = frozenset((
+    "nearby_vehicle", "pedestrian", "cyclist", "construction",
+    "traffic_element", "weather_condition", "road_hazard",
+    "emergency_vehicle", "animal", "special_vehicle",
+    "conflicting_vehicle", "door_opening_vehicle",
+))
+_REQUIRED_META = frozenset(("speed", "command"))
+
+# Transient API errors worth retrying. Other API status errors (bad request,
+# authentication, not found, ...) fail the same way on every attempt.
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Upper bound for a single retry delay (seconds)
+MAX_RETRY_DELAY_SECONDS = 60.0
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a failed VLM call may succeed if retried."""
+    if isinstance(error, _RETRYABLE_ERRORS):
+        return True
+    # Any other response from the API is a permanent failure; unknown errors are retried
+    return not isinstance(error, openai.APIStatusError)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the server through a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        # HTTP-date form, not worth parsing here
+        return None
+
+
+# Shared decoder; raw_decode locates and parses a JSON object in one forward pass
+_JSON_DECODER = json.JSONDecoder()
+
+# Opening line of a Markdown code fence; the closing fence is found with str.find,
+# so locating a fenced block never backtracks
+_FENCE_START_RE = re.compile(r"```(?:json)?[ \t]*\r?\n", re.IGNORECASE)
+
+
+def _fenced_block(text: str) -> Optional[str]:
+    """Content of the first Markdown code fence in text, or None if there is none."""
+    match = _FENCE_START_RE.search(text)
+    if match is None:
+        return None
+    end = text.find("```", match.end())
+    return text[match.end():end] if end != -1 else None
+
+
+class ResponseCache:
+    """Persistent exact-match cache of VLM responses backed by SQLite."""
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        """
+        Initialize response cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            ttl_seconds: Lifetime of cached responses (None keeps them forever)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, system_prompt: Union[str, List[Dict[str, Any]]],
+                 user_prompt: str, video_frames_base64: Optional[list] = None) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model_name: Model name
+            system_prompt: System prompt (string or content blocks)
+            user_prompt: User prompt
+            video_frames_base64: List of base64 encoded images
+
+        Returns:
+            Hex digest identifying the request
+        """
+        if not isinstance(system_prompt, str):
+            system_prompt = json.dumps(system_prompt, sort_keys=True)
+        h = hashlib.blake2b(digest_size=32)
+        for part in (model_name, system_prompt, user_prompt):
+            h.update(part.encode('utf-8'))
+            h.update(b"\0")
+        # Hash frames one at a time instead of joining them into one large buffer
+        for frame in video_frames_base64 or ():
+            h.update(frame.encode('ascii'))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        response, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return response
+
+    def set(self, key: str, response: str):
+        """Store a response under key."""
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                (key, response, expires_at),
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
 
 class VLMClient:
     """Client for calling VLM API with retry logic."""
 
     def __init__(self, api_key: str, model_name: str, max_retries: int = 3,
-                 retry_delay_seconds: float = 2.0, timeout_seconds: int = 60):
+                 retry_delay_seconds: float = 2.0, timeout_seconds: int = 60,
+                 concurrency: int = 8, prompt_cache_key: Optional[str] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 temperature: Optional[float] = None):
         """
         Initialize VLM client.
 
@@ -24,61 +175,253 @@ class VLMClient:
             max_retries: Maximum number of retries
             retry_delay_seconds: Initial delay between retries (exponential backoff)
             timeout_seconds: Timeout for API calls
+            concurrency: Maximum number of in-flight requests (the pipeline's limit, and
+                the default for call_vlm_batch)
+            prompt_cache_key: Provider prompt-cache key for the shared static prompt prefix
+            response_cache: Optional cache of previous responses; identical requests are
+                answered from it without an API call
+            temperature: Sampling temperature; None leaves the model's default, or
+                uses 0 when response_cache is set so cached responses are reproducible
         """
         self.api_key = api_key
         self.model_name = model_name
         self.max_retries = max_retries
         self.retry_delay_seconds = retry_delay_seconds
         self.timeout_seconds = timeout_seconds
+        self.concurrency = concurrency
+        self.prompt_cache_key = prompt_cache_key
+        self.response_cache = response_cache
+        if temperature is None and response_cache is not None:
+            temperature = 0.0
+        self.temperature = temperature
 
-        # Import test.py's call_vlm_with_oneapi function
-        self._import_vlm_caller()
-
-    def _import_vlm_caller(self):
-        """Import VLM caller from test.py."""
-        try:
-            # Add parent directory to path to import test.py
-            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            from test import call_vlm_with_oneapi
-            self.call_vlm_with_oneapi = call_vlm_with_oneapi
-        except ImportError as e:
-            logger.error(f"Failed to import call_vlm_with_oneapi from test.py: {e}")
-            raise
-
-    def call_vlm(self, system_prompt: str, user_prompt: str,
+    def call_vlm(self, system_prompt: Union[str, List[Dict[str, Any]]], user_prompt: str,
                  video_frames_base64: Optional[list] = None) -> Optional[str]:
         """
         Call VLM API with retry logic.
 
         Args:
-            system_prompt: System prompt
+            system_prompt: System prompt (string or prebuilt content blocks)
             user_prompt: User prompt with trajectory information
             video_frames_base64: List of base64 encoded images
 
         Returns:
             VLM response text or None if failed
         """
+        return self._call_vlm(system_prompt, user_prompt, video_frames_base64, parse=False)[0]
+
+    def call_vlm_parsed(self, system_prompt: Union[str, List[Dict[str, Any]]], user_prompt: str,
+                        video_frames_base64: Optional[list] = None
+                        ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Call VLM API with retry logic and parse the response.
+
+        Prefer this over call_vlm followed by parse_response: the response is
+        parsed once, for both the response cache and the caller.
+
+        Args:
+            system_prompt: System prompt (string or prebuilt content blocks)
+            user_prompt: User prompt with trajectory information
+            video_frames_base64: List of base64 encoded images
+
+        Returns:
+            (VLM response text or None if failed, parsed response or None if it
+            does not parse)
+        """
+        return self._call_vlm(system_prompt, user_prompt, video_frames_base64, parse=True)
+
+    def _call_vlm(self, system_prompt, user_prompt, video_frames_base64,
+                  parse: bool) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Shared body of call_vlm and call_vlm_parsed; parses if asked to or if caching needs it."""
+        cache_key = self._cache_key(system_prompt, user_prompt, video_frames_base64)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("VLM response cache hit")
+                return cached, (self.parse_response(cached) if parse else None)
+
+        # Request body is built once and reused by every retry
+        messages = build_messages(system_prompt, user_prompt, None, video_frames_base64)
+        response = self._call_vlm_with_retries(messages)
+        parsed = self.parse_response(response) if response and (parse or cache_key is not None) else None
+        self._store_response(cache_key, response, parsed)
+        return response, parsed
+
+    def _cache_key(self, system_prompt, user_prompt, video_frames_base64) -> Optional[str]:
+        """Response cache key for a request, or None if caching is disabled."""
+        if self.response_cache is None:
+            return None
+        return ResponseCache.make_key(self.model_name, system_prompt, user_prompt, video_frames_base64)
+
+    def _store_response(self, cache_key: Optional[str], response: Optional[str],
+                        parsed: Optional[Dict[str, Any]]):
+        """Cache a response, if caching is enabled and the response parsed (parsed is its parse_response result)."""
+        # Unparseable responses are not cached so the frame is retried on the next run
+        if cache_key is not None and parsed is not None:
+            self.response_cache.set(cache_key, response)
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Delay before the next attempt: full-jitter exponential backoff.
+
+        A uniform draw in [0, retry_delay_seconds * 2**attempt] keeps concurrent
+        workers hitting the same rate limit from retrying in lockstep. A
+        Retry-After header from the server sets the minimum delay.
+
+        Args:
+            attempt: Zero-based index of the attempt that failed
+            error: Exception raised by that attempt
+
+        Returns:
+            Delay in seconds
+        """
+        delay = random.uniform(0, min(MAX_RETRY_DELAY_SECONDS, self.retry_delay_seconds * (2 ** attempt)))
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, MAX_RETRY_DELAY_SECONDS))
+        return delay
+
+    def _call_vlm_with_retries(self, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Call the VLM API, retrying transient failures with jittered backoff."""
         for attempt in range(self.max_retries):
             try:
-                response = self.call_vlm_with_oneapi(
+                response = call_vlm_with_oneapi(
                     api_key=self.api_key,
                     model_name=self.model_name,
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    image_paths=None,
-                    video_frames_base64=video_frames_base64,
+                    system_prompt=None,
+                    user_prompt=None,
+                    prompt_cache_key=self.prompt_cache_key,
+                    temperature=self.temperature,
+                    messages=messages,
                 )
                 return response
             except Exception as e:
+                if not _is_retryable(e):
+                    logger.error("VLM API call failed with a non-retryable error: %s", e)
+                    return None
                 if attempt < self.max_retries - 1:
-                    delay = self.retry_delay_seconds * (2 ** attempt)
-                    logger.warning(f"VLM API call failed (attempt {attempt + 1}/{self.max_retries}): {e}")
-                    logger.info(f"Retrying in {delay:.1f} seconds...")
+                    delay = self._retry_delay(attempt, e)
+                    logger.warning("VLM API call failed (attempt %s/%s): %s", attempt + 1, self.max_retries, e)
+                    logger.info("Retrying in %.1f seconds...", delay)
                     time.sleep(delay)
                 else:
-                    logger.error(f"VLM API call failed after {self.max_retries} attempts: {e}")
+                    logger.error("VLM API call failed after %s attempts: %s", self.max_retries, e)
                     return None
 
+    async def call_vlm_async(self, system_prompt: Union[str, List[Dict[str, Any]]], user_prompt: str,
+                             video_frames_base64: Optional[list] = None) -> Optional[str]:
+        """
+        Call VLM API with retry logic without blocking the event loop.
+
+        Args:
+            system_prompt: System prompt (string or prebuilt content blocks)
+            user_prompt: User prompt with trajectory information
+            video_frames_base64: List of base64 encoded images
+
+        Returns:
+            VLM response text or None if failed
+        """
+        return (await self._call_vlm_async(system_prompt, user_prompt, video_frames_base64, parse=False))[0]
+
+    async def call_vlm_parsed_async(self, system_prompt: Union[str, List[Dict[str, Any]]], user_prompt: str,
+                                    video_frames_base64: Optional[list] = None
+                                    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Call VLM API and parse the response without blocking the event loop.
+
+        Same arguments and return value as call_vlm_parsed.
+        """
+        return await self._call_vlm_async(system_prompt, user_prompt, video_frames_base64, parse=True)
+
+    async def _call_vlm_async(self, system_prompt, user_prompt, video_frames_base64,
+                              parse: bool) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Async counterpart of _call_vlm; response cache reads and writes run in a worker thread."""
+        cache_key = self._cache_key(system_prompt, user_prompt, video_frames_base64)
+        if cache_key is not None:
+            # SQLite lookups block, so they stay off the event loop
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                logger.debug("VLM response cache hit")
+                return cached, (self.parse_response(cached) if parse else None)
+
+        # Request body is built once and reused by every retry
+        messages = build_messages(system_prompt, user_prompt, None, video_frames_base64)
+        response = await self._call_vlm_with_retries_async(messages)
+        parsed = self.parse_response(response) if response and (parse or cache_key is not None) else None
+        if cache_key is not None:
+            await asyncio.to_thread(self._store_response, cache_key, response, parsed)
+        return response, parsed
+
+    async def _call_vlm_with_retries_async(self, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Call the VLM API asynchronously, retrying transient failures with jittered backoff."""
+        for attempt in range(self.max_retries):
+            try:
+                return await call_vlm_with_oneapi_async(
+                    api_key=self.api_key,
+                    model_name=self.model_name,
+                    system_prompt=None,
+                    user_prompt=None,
+                    prompt_cache_key=self.prompt_cache_key,
+                    temperature=self.temperature,
+                    messages=messages,
+                )
+            except Exception as e:
+                if not _is_retryable(e):
+                    logger.error("VLM API call failed with a non-retryable error: %s", e)
+                    return None
+                if attempt < self.max_retries - 1:
+                    delay = self._retry_delay(attempt, e)
+                    logger.warning("VLM API call failed (attempt %s/%s): %s", attempt + 1, self.max_retries, e)
+                    logger.info("Retrying in %.1f seconds...", delay)
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error("VLM API call failed after %s attempts: %s", self.max_retries, e)
+                    return None
+
+    async def aclose(self):
+        """Close the pooled connections used by call_vlm_async on the running event loop."""
+        await close_async_clients()
+
+    async def _call_vlm_batch_async(self, requests: Sequence[Tuple[Any, str, Optional[list]]],
+                                    concurrency: int) -> List[Optional[str]]:
+        """Run call_vlm_async over requests with at most concurrency calls in flight."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded_call(system_prompt, user_prompt, video_frames_base64):
+            async with semaphore:
+                return await self.call_vlm_async(system_prompt, user_prompt, video_frames_base64)
+
+        try:
+            responses = await asyncio.gather(
+                *(bounded_call(*request) for request in requests),
+                return_exceptions=True,
+            )
+        finally:
+            await self.aclose()
+        # call_vlm_async already maps API failures to None; anything else is unexpected
+        for i, response in enumerate(responses):
+            if isinstance(response, BaseException):
+                logger.error("VLM batch request %s failed: %s", i, response)
+                responses[i] = None
+        return responses
+
+    def call_vlm_batch(self, requests: Sequence[Tuple[Any, str, Optional[list]]],
+                       concurrency: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Call VLM API for many requests concurrently.
+
+        Requests overlap on the network instead of waiting on one round-trip
+        each; every request keeps the same retry behaviour as call_vlm.
+
+        Args:
+            requests: Sequence of (system_prompt, user_prompt, video_frames_base64) tuples
+            concurrency: Maximum number of in-flight requests (defaults to self.concurrency)
+
+        Returns:
+            List of VLM response texts (None for failed requests), in request order
+        """
+        return asyncio.run(self._call_vlm_batch_async(requests, concurrency or self.concurrency))
+
     def parse_response(self, response_text: str) -> Optional[Dict[str, Any]]:
         """
         Parse VLM response JSON.
@@ -89,29 +432,54 @@ class VLMClient:
         Returns:
             Parsed JSON dictionary or None if parsing fails
         """
-        try:
-            # Try to extract JSON from response
-            # VLM might include extra text before/after JSON
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-
-            if start_idx == -1 or end_idx == 0:
-                logger.warning("No JSON found in VLM response")
-                return None
-
-            json_str = response_text[start_idx:end_idx]
-            parsed = json.loads(json_str)
-
-            # Validate response structure
-            if not self._validate_response_structure(parsed):
-                logger.warning("VLM response structure is invalid")
-                return None
-
-            return parsed
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse VLM response as JSON: {e}")
+        # VLM might include extra text before/after JSON: decode the first object
+        # starting at a '{', ignoring whatever follows it
+        start_idx = response_text.find('{')
+        if start_idx == -1:
+            logger.warning("No JSON found in VLM response")
+            return None
+
+        # Fast path: the whole span between the outer braces is the object (plain or
+        # fenced JSON), which orjson parses directly
+        if orjson is not None:
+            try:
+                parsed = orjson.loads(response_text[start_idx:response_text.rfind('}') + 1])
+                return parsed if self._validate_parsed(parsed) else None
+            except orjson.JSONDecodeError:
+                pass
+
+        # Fenced JSON followed by prose containing braces: parse just the fenced block
+        block = _fenced_block(response_text)
+        if block is not None:
+            try:
+                parsed = orjson.loads(block) if orjson is not None else json.loads(block)
+                return parsed if self._validate_parsed(parsed) else None
+            except ValueError:
+                pass
+
+        error = None
+        while start_idx != -1:
+            try:
+                parsed, _ = _JSON_DECODER.raw_decode(response_text, start_idx)
+                break
+            except json.JSONDecodeError as e:
+                # Keep the first error; it is the most informative one
+                error = error or e
+                # A stray brace in leading prose, try the next one
+                start_idx = response_text.find('{', start_idx + 1)
+        else:
+            logger.warning("Failed to parse VLM response as JSON: %s", error)
             return None
 
+        return parsed if self._validate_parsed(parsed) else None
+
+    def _validate_parsed(self, parsed: Dict[str, Any]) -> bool:
+        """Validate a decoded response, logging if its structure is invalid."""
+        if not self._validate_response_structure(parsed):
+            logger.warning("VLM response structure is invalid")
+            return False
+        return True
+
     def _validate_response_structure(self, response: Dict[str, Any]) -> bool:
         """
         Validate VLM response structure.
@@ -122,26 +490,19 @@ class VLMClient:
         Returns:
             True if valid, False otherwise
         """
-        required_keys = ["critical_objects", "explanation", "meta_behaviour"]
-        if not all(key in response for key in required_keys):
-            logger.warning(f"Missing required keys in response: {required_keys}")
+        if not _REQUIRED_TOP <= response.keys():
+            logger.warning("Missing required keys in response: %s", sorted(_REQUIRED_TOP))
             return False
 
         # Validate critical_objects
-        required_objects = [
-            "nearby_vehicle", "pedestrian", "cyclist", "construction",
-            "traffic_element", "weather_condition", "road_hazard",
-            "emergency_vehicle", "animal", "special_vehicle",
-            "conflicting_vehicle", "door_opening_vehicle"
-        ]
-        critical_objects = response.get("critical_objects", {})
-        if not all(obj in critical_objects for obj in required_objects):
-            logger.warning(f"Missing object classes in critical_objects")
+        critical_objects = response["critical_objects"]
+        if not isinstance(critical_objects, dict) or not _REQUIRED_OBJECTS <= critical_objects.keys():
+            logger.warning("Missing object classes in critical_objects")
             return False
 
         # Validate meta_behaviour
-        meta_behaviour = response.get("meta_behaviour", {})
-        if "speed" not in meta_behaviour or "command" not in meta_behaviour:
+        meta_behaviour = response["meta_behaviour"]
+        if not isinstance(meta_behaviour, dict) or not _REQUIRED_META <= meta_behaviour.keys():
             logger.warning("Missing speed or command in meta_behaviour")
             return False
 
@@ -4,52 +4,175 @@ Validate results for correctness and completeness.
 """
 
 import json
+import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Iterator
 
-def load_results(results_dir: str) -> List[Dict[str, Any]]:
-    """Load all result JSON files."""
-    results = []
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+from src.output_handler import RESULTS_JSONL_FILE, iter_jsonl_results
+
+# Result files decoded per worker task, and tasks queued per worker process;
+# together they bound how many decoded results wait to be consumed
+LOAD_CHUNK_SIZE = 64
+LOAD_CHUNKS_PER_WORKER = 2
+
+# Required keys, in the order missing ones are reported
+_REQUIRED_KEYS = ("metadata", "input_data", "vlm_response")
+_METADATA_KEYS = ("frame_name", "timestamp_micros", "processing_timestamp", "model_name")
+_INPUT_KEYS = ("past_trajectory", "future_trajectory", "ego_status")
+_EGO_KEYS = ("velocity", "speed", "intent")
+_VLM_KEYS = ("critical_objects", "explanation", "meta_behaviour")
+_CRITICAL_OBJECTS = (
+    "nearby_vehicle", "pedestrian", "cyclist", "construction",
+    "traffic_element", "weather_condition", "road_hazard",
+    "emergency_vehicle", "animal", "special_vehicle",
+    "conflicting_vehicle", "door_opening_vehicle"
+)
+_CRITICAL_VALUES = ("yes", "no")  # tuple, values may be unhashable JSON
+
+# Same keys as sets, for one C-level subset test in the common all-present case
+_REQUIRED_KEYS_SET = frozenset(_REQUIRED_KEYS)
+_METADATA_KEYS_SET = frozenset(_METADATA_KEYS)
+_INPUT_KEYS_SET = frozenset(_INPUT_KEYS)
+_EGO_KEYS_SET = frozenset(_EGO_KEYS)
+_VLM_KEYS_SET = frozenset(_VLM_KEYS)
+
+# JSON Schema equivalent of the checks in validate_result_structure
+RESULT_SCHEMA = {
+    "type": "object",
+    "required": list(_REQUIRED_KEYS),
+    "properties": {
+        "metadata": {
+            "type": "object",
+            "required": list(_METADATA_KEYS),
+        },
+        "input_data": {
+            "type": "object",
+            "required": list(_INPUT_KEYS),
+            "properties": {
+                "past_trajectory": {"type": "array", "minItems": 16, "maxItems": 16},
+                "future_trajectory": {"type": "array", "minItems": 20, "maxItems": 20},
+                "ego_status": {"type": "object", "required": list(_EGO_KEYS)},
+            },
+        },
+        "vlm_response": {
+            "type": "object",
+            "required": list(_VLM_KEYS),
+            "properties": {
+                "critical_objects": {
+                    "type": "object",
+                    "required": list(_CRITICAL_OBJECTS),
+                    "properties": {obj: {"enum": list(_CRITICAL_VALUES)} for obj in _CRITICAL_OBJECTS},
+                },
+                "meta_behaviour": {"type": "object", "required": ["speed", "command"]},
+            },
+        },
+    },
+}
+
+# Compiled once into straight-line Python when fastjsonschema is installed
+_validate_schema = fastjsonschema.compile(RESULT_SCHEMA) if fastjsonschema is not None else None
+
+def _load_one(json_file: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Load a single result file. Returns (result, None) or (None, error message)."""
+    try:
+        with open(json_file, 'rb') as f:
+            data = f.read()
+        return (orjson.loads(data) if orjson is not None else json.loads(data)), None
+    except Exception as e:
+        return None, f"Failed to load {json_file}: {e}"
+
+def _load_chunk(json_files: List[str]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Load a chunk of result files in one worker task."""
+    return [_load_one(json_file) for json_file in json_files]
+
+def _chunk_results(future) -> Iterator[Dict[str, Any]]:
+    """Yield the results of a _load_chunk task, printing load errors."""
+    for result, error in future.result():
+        if error:
+            print(f"Warning: {error}")
+        else:
+            yield result
+
+def iter_results(results_dir: str) -> Iterator[Dict[str, Any]]:
+    """Yield results one at a time: JSON files in sorted order, then results.jsonl.
+
+    Files are read and decoded in parallel worker processes, with only a
+    bounded window of chunks in flight, so memory does not grow with the
+    number of files; each result can be dropped by the caller as soon as it
+    has been used. Results written in the batched "jsonl" results_format are
+    streamed from results.jsonl.
+    """
     results_path = Path(results_dir)
 
     if not results_path.exists():
         print(f"Results directory not found: {results_dir}")
-        return results
+        return
 
-    for json_file in sorted(results_path.glob("*.json")):
-        try:
-            with open(json_file, 'r') as f:
-                result = json.load(f)
-                results.append(result)
-        except Exception as e:
-            print(f"Warning: Failed to load {json_file}: {e}")
+    json_files = sorted(str(p) for p in results_path.glob("*.json"))
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Sliding window of submitted chunks, consumed in order
+        max_in_flight = workers * LOAD_CHUNKS_PER_WORKER
+        window = deque()
+        for start in range(0, len(json_files), LOAD_CHUNK_SIZE):
+            window.append(executor.submit(_load_chunk, json_files[start:start + LOAD_CHUNK_SIZE]))
+            if len(window) >= max_in_flight:
+                yield from _chunk_results(window.popleft())
+        while window:
+            yield from _chunk_results(window.popleft())
 
-    return results
+    for result, error in iter_jsonl_results(results_path / RESULTS_JSONL_FILE):
+        if error:
+            print(f"Warning: {error}")
+        else:
+            yield result
+
+def load_results(results_dir: str) -> List[Dict[str, Any]]:
+    """Load all result JSON files into a list."""
+    return list(iter_results(results_dir))
 
 def validate_result_structure(result: Dict[str, Any]) -> Tuple[bool, List[str]]:
-    """Validate a single result structure."""
+    """Validate a single result structure.
+
+    Valid results are accepted by the compiled schema when fastjsonschema is
+    available; the field-by-field checks below only run to collect every
+    error of an invalid result (or when fastjsonschema is missing).
+    """
+    if _validate_schema is not None:
+        try:
+            _validate_schema(result)
+            return True, []
+        except fastjsonschema.JsonSchemaException:
+            pass
+
     errors = []
 
     # Check required top-level keys
-    required_keys = ["metadata", "input_data", "vlm_response"]
-    for key in required_keys:
-        if key not in result:
-            errors.append(f"Missing key: {key}")
+    if not _REQUIRED_KEYS_SET <= result.keys():
+        errors.extend(f"Missing key: {key}" for key in _REQUIRED_KEYS if key not in result)
 
     # Validate metadata
     metadata = result.get("metadata", {})
-    metadata_keys = ["frame_name", "timestamp_micros", "processing_timestamp", "model_name"]
-    for key in metadata_keys:
-        if key not in metadata:
-            errors.append(f"Missing metadata key: {key}")
+    if not _METADATA_KEYS_SET <= metadata.keys():
+        errors.extend(f"Missing metadata key: {key}" for key in _METADATA_KEYS if key not in metadata)
 
     # Validate input_data
     input_data = result.get("input_data", {})
-    input_keys = ["past_trajectory", "future_trajectory", "ego_status"]
-    for key in input_keys:
-        if key not in input_data:
-            errors.append(f"Missing input_data key: {key}")
+    if not _INPUT_KEYS_SET <= input_data.keys():
+        errors.extend(f"Missing input_data key: {key}" for key in _INPUT_KEYS if key not in input_data)
 
     # Validate trajectories
     past_traj = input_data.get("past_trajectory", [])
@@ -62,30 +185,20 @@ def validate_result_structure(result: Dict[str, Any]) -> Tuple[bool, List[str]]:
 
     # Validate ego_status
     ego_status = input_data.get("ego_status", {})
-    ego_keys = ["velocity", "speed", "intent"]
-    for key in ego_keys:
-        if key not in ego_status:
-            errors.append(f"Missing ego_status key: {key}")
+    if not _EGO_KEYS_SET <= ego_status.keys():
+        errors.extend(f"Missing ego_status key: {key}" for key in _EGO_KEYS if key not in ego_status)
 
     # Validate VLM response
     vlm_response = result.get("vlm_response", {})
-    vlm_keys = ["critical_objects", "explanation", "meta_behaviour"]
-    for key in vlm_keys:
-        if key not in vlm_response:
-            errors.append(f"Missing vlm_response key: {key}")
+    if not _VLM_KEYS_SET <= vlm_response.keys():
+        errors.extend(f"Missing vlm_response key: {key}" for key in _VLM_KEYS if key not in vlm_response)
 
     # Validate critical_objects
     critical_objects = vlm_response.get("critical_objects", {})
-    required_objects = [
-        "nearby_vehicle", "pedestrian", "cyclist", "construction",
-        "traffic_element", "weather_condition", "road_hazard",
-        "emergency_vehicle", "animal", "special_vehicle",
-        "conflicting_vehicle", "door_opening_vehicle"
-    ]
-    for obj in required_objects:
+    for obj in _CRITICAL_OBJECTS:
         if obj not in critical_objects:
             errors.append(f"Missing critical object: {obj}")
-        elif critical_objects[obj] not in ["yes", "no"]:
+        elif critical_objects[obj] not in _CRITICAL_VALUES:
             errors.append(f"Invalid value for {obj}: {critical_objects[obj]}")
 
     # Validate meta_behaviour
@@ -97,14 +210,19 @@ def validate_result_structure(result: Dict[str, Any]) -> Tuple[bool, List[str]]:
 
     return len(errors) == 0, errors
 
-def validate_all_results(results: List[Dict]) -> Dict[str, Any]:
-    """Validate all results."""
-    total = len(results)
+def validate_all_results(results: Iterable[Dict]) -> Dict[str, Any]:
+    """Validate all results.
+
+    Counts are accumulated while iterating, so results may be a generator
+    (e.g. iter_results) and never held in memory together.
+    """
+    total = 0
     valid = 0
     invalid = 0
     errors_by_type = {}
 
-    for i, result in enumerate(results):
+    for result in results:
+        total += 1
         is_valid, errors = validate_result_structure(result)
         if is_valid:
             valid += 1
@@ -158,16 +276,15 @@ def main():
         results_dir = sys.argv[1]
 
     print(f"Validating results from: {results_dir}")
-    results = load_results(results_dir)
 
-    if not results:
+    # Validate while streaming results from disk
+    validation_result = validate_all_results(iter_results(results_dir))
+
+    if validation_result['total'] == 0:
         print("No results found")
         return 1
 
-    print(f"Loaded {len(results)} results\n")
-
-    # Validate
-    validation_result = validate_all_results(results)
+    print(f"Loaded {validation_result['total']} results\n")
     print_validation_report(validation_result)
 
     # Return exit code based on validity
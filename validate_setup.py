@@ -3,10 +3,26 @@
 Validation script to check pipeline setup and configuration.
 """
 
+import heapq
+import importlib.util
 import os
 import sys
 import json
-from pathlib import Path
+
+# Module providing the Waymo E2E frame proto
+WAYMO_E2E_PROTO_MODULE = "waymo_open_dataset.protos.end_to_end_driving_data_pb2"
+
+def _module_available(name: str) -> bool:
+    """Check that a module can be imported, without importing it.
+
+    Only the parent packages of a dotted name are imported (as find_spec
+    requires); the module itself is never executed.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        # A parent package is missing
+        return False
 
 def check_environment():
     """Check environment setup."""
@@ -44,10 +60,9 @@ def check_dependencies():
 
     all_ok = True
     for dep in dependencies:
-        try:
-            __import__(dep)
+        if _module_available(dep):
             print(f"✓ {dep}")
-        except ImportError:
+        else:
             print(f"✗ {dep} (not installed)")
             all_ok = False
 
@@ -66,17 +81,29 @@ def check_files():
         "waymo_e2e_processor.py",
         "src/config.py",
         "src/dataset_loader.py",
+        "src/frame_view.py",
         "src/image_processor.py",
         "src/trajectory_extractor.py",
         "src/prompt_builder.py",
         "src/vlm_client.py",
+        "src/oneapi_caller.py",
         "src/output_handler.py",
         "src/utils.py",
     ]
 
+    # One directory listing per parent instead of a stat per file
+    listings = {}
+    for parent in {os.path.dirname(file) for file in required_files}:
+        try:
+            with os.scandir(parent or ".") as entries:
+                listings[parent] = {entry.name for entry in entries}
+        except OSError:
+            listings[parent] = set()
+
     all_ok = True
     for file in required_files:
-        if Path(file).exists():
+        parent, name = os.path.split(file)
+        if name in listings[parent]:
             print(f"✓ {file}")
         else:
             print(f"✗ {file} (not found)")
@@ -91,9 +118,8 @@ def check_configuration():
     print("=" * 60)
 
     try:
-        import yaml
-        with open("config.yaml", 'r') as f:
-            config = yaml.safe_load(f)
+        from src.config import _load_yaml_cached
+        config = _load_yaml_cached("config.yaml")
 
         # Check required sections
         required_sections = ["dataset", "image_processing", "vlm_api", "output"]
@@ -122,13 +148,52 @@ def check_waymo_dataset():
     print("WAYMO DATASET CHECK")
     print("=" * 60)
 
-    try:
-        from waymo_open_dataset.protos import end_to_end_driving_data_pb2
+    if _module_available(WAYMO_E2E_PROTO_MODULE):
         print("✓ Waymo E2E dataset proto available")
         return True
-    except ImportError as e:
-        print(f"✗ Waymo dataset not available: {e}")
-        return False
+    print(f"✗ Waymo dataset not available: no module named {WAYMO_E2E_PROTO_MODULE!r}")
+    return False
+
+# Checks in display order, and the checks each one depends on
+CHECKS = [
+    ("Environment", check_environment),
+    ("Dependencies", check_dependencies),
+    ("Files", check_files),
+    ("Configuration", check_configuration),
+    ("Waymo Dataset", check_waymo_dataset),
+]
+CHECK_DEPENDENCIES = {
+    "Configuration": ("Files", "Dependencies"),
+    "Waymo Dataset": ("Dependencies",),
+}
+
+def _order_checks(checks):
+    """Order checks so each runs after its dependencies (Kahn's algorithm).
+
+    Among the checks that are ready to run, the earliest in display order goes
+    first, so the display order is kept wherever the dependencies allow it.
+    """
+    position = {name: index for index, (name, _) in enumerate(checks)}
+    remaining = {name: len(CHECK_DEPENDENCIES.get(name, ())) for name in position}
+    dependents = {name: [] for name in position}
+    for name, deps in CHECK_DEPENDENCIES.items():
+        for dep in deps:
+            dependents[dep].append(name)
+
+    ready = [index for name, index in position.items() if remaining[name] == 0]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        name, check_func = checks[heapq.heappop(ready)]
+        ordered.append((name, check_func))
+        for dependent in dependents[name]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                heapq.heappush(ready, position[dependent])
+
+    if len(ordered) != len(checks):
+        raise ValueError("Cyclic dependencies between setup checks")
+    return ordered
 
 def main():
     """Run all checks."""
@@ -136,16 +201,13 @@ def main():
     print("WAYMO E2E PIPELINE VALIDATION")
     print("=" * 60 + "\n")
 
-    checks = [
-        ("Environment", check_environment),
-        ("Dependencies", check_dependencies),
-        ("Files", check_files),
-        ("Configuration", check_configuration),
-        ("Waymo Dataset", check_waymo_dataset),
-    ]
-
     results = {}
-    for name, check_func in checks:
+    for name, check_func in _order_checks(CHECKS):
+        # A check whose prerequisite failed (or was skipped) cannot give a useful answer
+        failed_deps = [dep for dep in CHECK_DEPENDENCIES.get(name, ()) if results[dep] is not True]
+        if failed_deps:
+            results[name] = None
+            continue
         try:
             results[name] = check_func()
         except Exception as e:
@@ -157,11 +219,15 @@ def main():
     print("SUMMARY")
     print("=" * 60)
 
-    for name, result in results.items():
-        status = "✓ PASS" if result else "✗ FAIL"
+    for name, _ in CHECKS:
+        result = results[name]
+        if result is None:
+            status = "- SKIPPED (depends on " + ", ".join(CHECK_DEPENDENCIES[name]) + ")"
+        else:
+            status = "✓ PASS" if result else "✗ FAIL"
         print(f"{name}: {status}")
 
-    all_ok = all(results.values())
+    all_ok = all(result is True for result in results.values())
 
     print("\n" + "=" * 60)
     if all_ok:
@@ -8,22 +8,41 @@ annotations using a Vision Language Model (VLM).
 """
 
 import argparse
+import asyncio
+import concurrent.futures
 import logging
+import multiprocessing
+import threading
 import time
 import sys
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 
 from src.config import WaymoE2EConfig
-from src.dataset_loader import WaymoE2EDatasetLoader
-from src.image_processor import ImageProcessor
-from src.trajectory_extractor import TrajectoryExtractor
-from src.prompt_builder import PromptBuilder
-from src.vlm_client import VLMClient
 from src.output_handler import OutputHandler
-from src.utils import setup_logging, format_time, estimate_remaining_time
+from src.utils import EAGER_IMPORT, setup_logging, format_time, estimate_remaining_time
+
+# The pipeline components pull in TensorFlow, OpenCV and the OpenAI SDK; they are
+# imported in WaymoE2EPipeline.__init__ so --help and config errors return quickly
+if EAGER_IMPORT:
+    import src.dataset_loader, src.image_processor, src.trajectory_extractor  # noqa: E401,F401
+    import src.prompt_builder, src.vlm_client  # noqa: E401,F401
 
 logger = logging.getLogger(__name__)
 
+# Minimum time between two progress log lines (checkpoints may be more frequent)
+PROGRESS_LOG_INTERVAL_SECONDS = 1.0
+
+# Frames prepared ahead of the VLM calls by the prefetch thread
+PREFETCH_FRAMES = 2
+
+# Markers in the prefetch queue: end of the frame stream, and a frame whose
+# result is already on disk
+_END_OF_FRAMES = object()
+_HAS_RESULT = object()
+# How often a blocked producer checks whether the consumer has stopped
+_PUT_POLL_SECONDS = 0.5
+
 
 class WaymoE2EPipeline:
     """Main pipeline for processing Waymo E2E dataset."""
@@ -35,9 +54,29 @@ class WaymoE2EPipeline:
         Args:
             config: Configuration object
         """
+        from src.dataset_loader import WaymoE2EDatasetLoader
+        from src.image_processor import ImageProcessor, _encode_frame_images, _init_encode_worker
+        from src.trajectory_extractor import TrajectoryExtractor
+        from src.prompt_builder import PromptBuilder
+        from src.vlm_client import VLMClient, ResponseCache
+
         self.config = config
         self.run_dir = config.get_run_dir()
 
+        # Per-run constants used for every frame, resolved once
+        self._model_name = config.vlm_api.model_name
+        self._input_mode = config.image_processing.input_mode
+        self._save_images = config.output.save_images
+        self._images_included = (
+            ["concatenated"] if self._input_mode == "concatenated"
+            else ["front_left", "front", "front_right"]
+        )
+        self._image_names = self._images_included if self._save_images else None
+        self._metadata_template = {
+            "model_name": self._model_name,
+            "image_mode": self._input_mode,
+        }
+
         # Initialize components
         self.dataset_loader = WaymoE2EDatasetLoader(
             config.dataset.path,
@@ -48,6 +87,21 @@ class WaymoE2EPipeline:
             config.image_processing.input_mode,
             config.image_processing.jpeg_quality
         )
+        # Optional process pool running image decode/encode outside the GIL; spawned
+        # rather than forked, since the parent runs TensorFlow threads
+        self._encode_pool = None
+        self._encode_frame_images = _encode_frame_images
+        if config.image_processing.encode_workers > 0:
+            self._encode_pool = ProcessPoolExecutor(
+                max_workers=config.image_processing.encode_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_encode_worker,
+                initargs=(
+                    config.image_processing.target_height,
+                    config.image_processing.input_mode,
+                    config.image_processing.jpeg_quality,
+                ),
+            )
         self.trajectory_extractor = TrajectoryExtractor(
             config.trajectory.past_duration_seconds,
             config.trajectory.past_frequency_hz,
@@ -55,122 +109,237 @@ class WaymoE2EPipeline:
             config.trajectory.future_frequency_hz
         )
         self.prompt_builder = PromptBuilder(config.vlm_api.prompt_template_path)
+        self.response_cache = None
+        if config.vlm_api.response_cache_path:
+            self.response_cache = ResponseCache(
+                config.vlm_api.response_cache_path,
+                config.vlm_api.response_cache_ttl_seconds,
+            )
         self.vlm_client = VLMClient(
             config.get_api_key(),
             config.vlm_api.model_name,
             config.vlm_api.max_retries,
             config.vlm_api.retry_delay_seconds,
-            config.vlm_api.timeout_seconds
+            config.vlm_api.timeout_seconds,
+            config.vlm_api.concurrency,
+            self.prompt_builder.cache_key if config.vlm_api.prompt_caching else None,
+            self.response_cache,
+            config.vlm_api.temperature,
+        )
+        # Static system content (system prompt + template), built once and sent
+        # as the same prefix with every request
+        self.system_block = self.prompt_builder.build_system_block(
+            config.vlm_api.system_prompt, config.vlm_api.prompt_caching
         )
         self.output_handler = OutputHandler(
             str(self.run_dir),
             config.output.results_subdir,
             config.output.checkpoint_file,
-            config.output.save_images
+            config.output.save_images,
+            config.output.results_format
         )
 
         # Statistics
         self.processed_frames = 0
         self.skipped_frames = 0
         self.failed_frames = 0
-        self.start_time = None
+        self.start_time = None  # time.monotonic() at the start of run()
+
+        # Progress is logged at most once per PROGRESS_LOG_INTERVAL_SECONDS; the
+        # level check is done once since the level is fixed for the run
+        self._last_progress_log = float("-inf")
+        self._log_progress = logger.isEnabledFor(logging.INFO)
 
     def process_frame(self, frame, frame_index: int) -> bool:
         """
         Process a single frame.
 
         Args:
-            frame: E2EDFrame object
+            frame: FrameView from the dataset loader
             frame_index: Frame index for logging
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            frame_name = frame.frame.context.name
-            timestamp_micros = frame.frame.timestamp_micros
-
-            logger.info(f"Processing frame {frame_index}: {frame_name}")
-
-            # Extract images
-            images_base64 = self.image_processor.process_images(frame)
-            if not images_base64:
-                logger.warning(f"Failed to extract images for frame {frame_name}")
+            prepared = self._prepare_frame(frame, frame_index)
+            if prepared is None:
                 self.skipped_frames += 1
                 return False
-
-            # Extract trajectories and ego status
-            try:
-                trajectory_data = self.trajectory_extractor.extract_all(frame)
-            except ValueError as e:
-                logger.warning(f"Skipping frame {frame_name} (frame_index {frame_index}): {e}")
-                self.skipped_frames += 1
+            images_jpeg, trajectory_data, user_prompt = prepared
+            if isinstance(images_jpeg, Future):
+                images_jpeg = images_jpeg.result()
+            images_base64 = self._images_to_base64(frame, images_jpeg)
+            if images_base64 is None:
                 return False
 
-            # Build prompt
-            user_prompt = self.prompt_builder.build_prompt(trajectory_data)
-
             # Call VLM API
-            vlm_response_text = self.vlm_client.call_vlm(
-                system_prompt=self.config.vlm_api.system_prompt,
+            vlm_response_text, vlm_response = self.vlm_client.call_vlm_parsed(
+                system_prompt=self.system_block,
                 user_prompt=user_prompt,
                 video_frames_base64=images_base64
             )
 
-            if not vlm_response_text:
-                logger.warning(f"VLM API call failed for frame {frame_name}")
-                self.failed_frames += 1
-                return False
+            return self._save_frame_result(frame, images_jpeg, trajectory_data,
+                                           vlm_response_text, vlm_response)
 
-            # Parse VLM response
-            vlm_response = self.vlm_client.parse_response(vlm_response_text)
-            if not vlm_response:
-                logger.warning(f"Failed to parse VLM response for frame {frame_name}")
-                self.failed_frames += 1
-                return False
+        except Exception as e:
+            logger.error("Error processing frame %s: %s", frame_index, e, exc_info=True)
+            self.failed_frames += 1
+            return False
 
-            # Prepare metadata
-            metadata = {
-                "timestamp_micros": timestamp_micros,
-                "model_name": self.config.vlm_api.model_name,
-                "image_mode": self.config.image_processing.input_mode,
-            }
+    async def process_frame_async(self, frame, frame_index: int, prepared=None) -> bool:
+        """
+        Process a single frame, awaiting the VLM call instead of blocking on it.
 
-            # Prepare input data
-            input_data = {
-                "past_trajectory": trajectory_data["past_trajectory"],
-                "future_trajectory": trajectory_data["future_trajectory"],
-                "ego_status": trajectory_data["ego_status"],
-                "images_included": ["concatenated"] if self.config.image_processing.input_mode == "concatenated" else ["front_left", "front", "front_right"],
-            }
+        Args:
+            frame: FrameView from the dataset loader
+            frame_index: Frame index for logging
+            prepared: Output of _prepare_frame if it already ran (e.g. in the
+                prefetch thread); computed here otherwise
 
-            # Prepare image names for saving
-            if self.config.output.save_images:
-                if self.config.image_processing.input_mode == "concatenated":
-                    image_names = ["concatenated"]
-                else:
-                    image_names = ["front_left", "front", "front_right"]
-            else:
-                image_names = None
-
-            # Save result
-            self.output_handler.save_result(
-                frame_name,
-                metadata,
-                input_data,
-                vlm_response,
-                images_base64=images_base64 if self.config.output.save_images else None,
-                image_names=image_names
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            if prepared is None:
+                prepared = self._prepare_frame(frame, frame_index)
+                if prepared is None:
+                    self.skipped_frames += 1
+                    return False
+            images_jpeg, trajectory_data, user_prompt = prepared
+            if isinstance(images_jpeg, Future):
+                images_jpeg = await asyncio.wrap_future(images_jpeg)
+            images_base64 = self._images_to_base64(frame, images_jpeg)
+            if images_base64 is None:
+                return False
+
+            # Call VLM API
+            vlm_response_text, vlm_response = await self.vlm_client.call_vlm_parsed_async(
+                system_prompt=self.system_block,
+                user_prompt=user_prompt,
+                video_frames_base64=images_base64
             )
 
-            self.processed_frames += 1
-            return True
+            return self._save_frame_result(frame, images_jpeg, trajectory_data,
+                                           vlm_response_text, vlm_response)
 
         except Exception as e:
-            logger.error(f"Error processing frame {frame_index}: {e}", exc_info=True)
+            logger.error("Error processing frame %s: %s", frame_index, e, exc_info=True)
+            self.failed_frames += 1
+            return False
+
+    def _prepare_frame(self, frame, frame_index: int):
+        """
+        Build everything the VLM call needs for a frame (images, trajectories, prompt).
+
+        With an encode pool, the images are processed in a worker process and
+        returned as a Future, so the caller can wait for them only just before
+        the VLM call. Skipped frames are counted by the caller.
+
+        Args:
+            frame: FrameView from the dataset loader
+            frame_index: Frame index for logging
+
+        Returns:
+            Tuple of (images_jpeg, trajectory_data, user_prompt), where images_jpeg
+            is a list of JPEG images or a Future of one, or None if the frame was skipped
+        """
+        frame_name = frame.name
+
+        logger.info("Processing frame %s: %s", frame_index, frame_name)
+
+        # Extract images (raw JPEG, kept for saving without a base64 round-trip)
+        if self._encode_pool is not None:
+            images_jpeg = self._encode_pool.submit(self._encode_frame_images, frame)
+        else:
+            images_jpeg = self.image_processor.process_images_jpeg(frame)
+            if not images_jpeg:
+                logger.warning("Failed to extract images for frame %s", frame_name)
+                return None
+
+        # Extract trajectories and ego status
+        try:
+            trajectory_data = self.trajectory_extractor.extract_all(frame)
+        except ValueError as e:
+            logger.warning("Skipping frame %s (frame_index %s): %s", frame_name, frame_index, e)
+            if isinstance(images_jpeg, Future):
+                images_jpeg.cancel()
+            return None
+
+        # Build per-frame prompt (the template is part of the cached system block)
+        user_prompt = self.prompt_builder.build_user_suffix(trajectory_data)
+
+        return images_jpeg, trajectory_data, user_prompt
+
+    def _images_to_base64(self, frame, images_jpeg):
+        """
+        Base64-encode a frame's processed images for the VLM request.
+
+        Args:
+            frame: FrameView the images belong to
+            images_jpeg: JPEG encoded images (None or empty if processing failed)
+
+        Returns:
+            List of base64 strings, or None (frame counted as skipped) if there are no images
+        """
+        if not images_jpeg:
+            logger.warning("Failed to extract images for frame %s", frame.name)
+            self.skipped_frames += 1
+            return None
+        return [self.image_processor.jpeg_to_base64(jpeg) for jpeg in images_jpeg]
+
+    def _save_frame_result(self, frame, images_jpeg, trajectory_data, vlm_response_text,
+                           vlm_response) -> bool:
+        """
+        Save the result for a frame from its parsed VLM response.
+
+        Args:
+            frame: FrameView from the dataset loader
+            images_jpeg: JPEG-encoded images sent with the request
+            trajectory_data: Trajectories and ego status of the frame
+            vlm_response_text: Raw VLM response text (None if the call failed)
+            vlm_response: Parsed VLM response (None if it did not parse)
+
+        Returns:
+            True if the result was saved, False otherwise
+        """
+        frame_name = frame.name
+
+        if not vlm_response_text:
+            logger.warning("VLM API call failed for frame %s", frame_name)
             self.failed_frames += 1
             return False
 
+        if not vlm_response:
+            logger.warning("Failed to parse VLM response for frame %s", frame_name)
+            self.failed_frames += 1
+            return False
+
+        # Prepare metadata
+        metadata = {"timestamp_micros": frame.timestamp_micros, **self._metadata_template}
+
+        # Prepare input data
+        input_data = {
+            "past_trajectory": trajectory_data["past_trajectory"],
+            "future_trajectory": trajectory_data["future_trajectory"],
+            "ego_status": trajectory_data["ego_status"],
+            "images_included": self._images_included,
+        }
+
+        # Save result
+        self.output_handler.save_result(
+            frame_name,
+            metadata,
+            input_data,
+            vlm_response,
+            image_names=self._image_names,
+            images_jpeg=images_jpeg if self._save_images else None
+        )
+
+        self.processed_frames += 1
+        return True
+
     def _save_run_metadata(self):
         """Save config and prompt template to run directory."""
         import shutil
@@ -188,6 +357,7 @@ class WaymoE2EPipeline:
                     'cameras': self.config.image_processing.cameras,
                     'input_mode': self.config.image_processing.input_mode,
                     'jpeg_quality': self.config.image_processing.jpeg_quality,
+                    'encode_workers': self.config.image_processing.encode_workers,
                 },
                 'trajectory': {
                     'past_duration_seconds': self.config.trajectory.past_duration_seconds,
@@ -203,6 +373,11 @@ class WaymoE2EPipeline:
                     'max_retries': self.config.vlm_api.max_retries,
                     'retry_delay_seconds': self.config.vlm_api.retry_delay_seconds,
                     'timeout_seconds': self.config.vlm_api.timeout_seconds,
+                    'concurrency': self.config.vlm_api.concurrency,
+                    'response_cache_path': self.config.vlm_api.response_cache_path,
+                    'response_cache_ttl_seconds': self.config.vlm_api.response_cache_ttl_seconds,
+                    'prompt_caching': self.config.vlm_api.prompt_caching,
+                    'temperature': self.config.vlm_api.temperature,
                 },
                 'processing': {
                     'batch_size': self.config.processing.batch_size,
@@ -217,6 +392,7 @@ class WaymoE2EPipeline:
                     'checkpoint_file': self.config.output.checkpoint_file,
                     'log_file': self.config.output.log_file,
                     'save_images': self.config.output.save_images,
+                    'results_format': self.config.output.results_format,
                 },
                 'logging': {
                     'level': self.config.logging.level,
@@ -229,17 +405,17 @@ class WaymoE2EPipeline:
             config_path = self.run_dir / "config.yaml"
             with open(config_path, 'w') as f:
                 yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
-            logger.info(f"Saved config to {config_path}")
+            logger.info("Saved config to %s", config_path)
 
             # Copy prompt template
             prompt_src = Path(self.config.vlm_api.prompt_template_path)
             if prompt_src.exists():
                 prompt_dst = self.run_dir / "prompt_template.txt"
                 shutil.copy(prompt_src, prompt_dst)
-                logger.info(f"Saved prompt template to {prompt_dst}")
+                logger.info("Saved prompt template to %s", prompt_dst)
 
         except Exception as e:
-            logger.warning(f"Failed to save run metadata: {e}")
+            logger.warning("Failed to save run metadata: %s", e)
 
     def run(self, resume: bool = False):
         """
@@ -249,74 +425,36 @@ class WaymoE2EPipeline:
             resume: Whether to resume from checkpoint
         """
         logger.info("Starting Waymo E2E dataset processing pipeline")
-        logger.info(f"Run directory: {self.run_dir}")
-        logger.info(f"Configuration: {self.config}")
+        logger.info("Run directory: %s", self.run_dir)
+        logger.info("Configuration: %s", self.config)
 
         # Save config and prompt to run directory
         self._save_run_metadata()
 
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
 
         # Load checkpoint if resuming
-        processed_frames_set = set()
+        # Insertion-ordered set of processed frame names (dict keys), so checkpoints
+        # and the processing order log reflect the actual processing order
+        processed_frames_set = {}
         if resume:
             processed_frames_set = self.output_handler.load_checkpoint()
-            logger.info(f"Resuming from checkpoint with {len(processed_frames_set)} processed frames")
+            logger.info("Resuming from checkpoint with %s processed frames", len(processed_frames_set))
 
-        # Get frame iterator
-        frame_iterator = self.dataset_loader.get_frame_iterator(
-            self.config.processing.max_frames
-        )
-
-        frame_index = 0
         try:
-            for frame in frame_iterator:
-                frame_name = frame.frame.context.name
-
-                # Check if output file already exists
-                result_file = self.output_handler.results_dir / f"{frame_name}.json"
-                if result_file.exists():
-                    logger.debug(f"Skipping frame with existing output: {frame_name}")
-                    processed_frames_set.add(frame_name)
-                    frame_index += 1
-                    continue
-
-                # Skip if already processed (checkpoint)
-                if resume and frame_name in processed_frames_set:
-                    logger.debug(f"Skipping already processed frame: {frame_name}")
-                    frame_index += 1
-                    continue
-
-                # Process frame
-                success = self.process_frame(frame, frame_index)
-
-                if success:
-                    processed_frames_set.add(frame_name)
-
-                # Save checkpoint periodically
-                if (frame_index + 1) % self.config.processing.checkpoint_interval == 0:
-                    self.output_handler.save_checkpoint(processed_frames_set)
-                    elapsed = time.time() - self.start_time
-                    remaining = estimate_remaining_time(
-                        self.processed_frames,
-                        self.processed_frames + self.skipped_frames + self.failed_frames,
-                        elapsed
-                    )
-                    logger.info(
-                        f"Checkpoint saved. Processed: {self.processed_frames}, "
-                        f"Skipped: {self.skipped_frames}, Failed: {self.failed_frames}, "
-                        f"Elapsed: {format_time(elapsed)}, Remaining: {remaining}"
-                    )
-
-                frame_index += 1
-
+            asyncio.run(self._run_frames(processed_frames_set, resume))
         except KeyboardInterrupt:
             logger.info("Pipeline interrupted by user")
         except Exception as e:
-            logger.error(f"Pipeline error: {e}", exc_info=True)
+            logger.error("Pipeline error: %s", e, exc_info=True)
         finally:
-            # Save final checkpoint
+            # Save final checkpoint (flushes any buffered results first)
             self.output_handler.save_checkpoint(processed_frames_set)
+            self.output_handler.close()
+            if self._encode_pool is not None:
+                self._encode_pool.shutdown(cancel_futures=True)
+            if self.response_cache is not None:
+                self.response_cache.close()
 
             # Save processing order log
             self.output_handler.save_processing_order_log(list(processed_frames_set))
@@ -330,9 +468,208 @@ class WaymoE2EPipeline:
                 self.failed_frames
             )
 
-            elapsed = time.time() - self.start_time
-            logger.info(f"Pipeline completed in {format_time(elapsed)}")
-            logger.info(f"Summary: {summary}")
+            elapsed = time.monotonic() - self.start_time
+            logger.info("Pipeline completed in %s", format_time(elapsed))
+            logger.info("Summary: %s", summary)
+
+
+    async def _run_frames(self, processed_frames_set: dict, resume: bool):
+        """
+        Process all frames with up to vlm_api.concurrency VLM calls in flight.
+
+        A prefetch thread reads and parses frames and runs the CPU-side work
+        (image processing, trajectories, prompt), so the next frames are ready
+        while earlier requests are in flight. Result writes and checkpoints run
+        on the event loop thread, which keeps the output handler single-writer.
+
+        Args:
+            processed_frames_set: Processed frame names, updated in place
+            resume: Whether to skip frames listed in the checkpoint
+        """
+        concurrency = self.config.vlm_api.concurrency
+        checkpoint_interval = self.config.processing.checkpoint_interval
+        loop = asyncio.get_running_loop()
+        frames = asyncio.Queue(maxsize=PREFETCH_FRAMES)
+        stop = threading.Event()
+        # Snapshot for the prefetch thread, which must not read the live dict
+        checkpointed = frozenset(processed_frames_set) if resume else frozenset()
+        producer = loop.run_in_executor(None, self._feed_frames, loop, frames, stop, checkpointed)
+        semaphore = asyncio.Semaphore(concurrency)
+        in_flight = set()
+        frames_done = 0
+        # Frames processed since the last checkpoint, appended to the checkpoint log
+        pending_adds = []
+        # VLM calls finish out of order; outcomes are held here by arrival number
+        # (dataset order) and committed in that order, so the checkpoint and the
+        # processing order log do not depend on request latencies
+        completed = {}
+        next_seq = 0
+
+        def commit(frame_name, success, counts):
+            nonlocal frames_done
+            if success:
+                processed_frames_set[frame_name] = None
+                pending_adds.append(frame_name)
+            if not counts:
+                return
+
+            # Save checkpoint periodically
+            frames_done += 1
+            if frames_done % checkpoint_interval == 0:
+                self._append_checkpoint(pending_adds)
+                pending_adds.clear()
+
+        def frame_done(seq, frame_name, success, counts=True):
+            nonlocal next_seq
+            completed[seq] = (frame_name, success, counts)
+            while next_seq in completed:
+                commit(*completed.pop(next_seq))
+                next_seq += 1
+
+        async def process(seq, frame, frame_index, prepared):
+            try:
+                frame_done(seq, frame.name, await self.process_frame_async(frame, frame_index, prepared))
+            finally:
+                semaphore.release()
+
+        try:
+            seq = -1
+            while (item := await frames.get()) is not _END_OF_FRAMES:
+                if isinstance(item, BaseException):
+                    raise item
+                frame, frame_index, prepared = item
+                seq += 1
+
+                if prepared is _HAS_RESULT:
+                    logger.debug("Skipping frame with existing output: %s", frame.name)
+                    frame_done(seq, frame.name, True, counts=False)
+                    continue
+
+                if prepared is None or isinstance(prepared, Exception):
+                    if prepared is None:
+                        self.skipped_frames += 1
+                    else:
+                        logger.error("Error processing frame %s: %s", frame_index, prepared,
+                                     exc_info=prepared)
+                        self.failed_frames += 1
+                    frame_done(seq, frame.name, False)
+                    continue
+
+                # Wait for a free slot, then run the VLM call in its own task
+                await semaphore.acquire()
+                task = asyncio.create_task(process(seq, frame, frame_index, prepared))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            # Drain the frames still in flight
+            for task in asyncio.as_completed(list(in_flight)):
+                await task
+        finally:
+            stop.set()
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(producer, *in_flight, return_exceptions=True)
+            await self.vlm_client.aclose()
+            # On interruption, keep frames that finished behind a cancelled one
+            for seq in sorted(completed):
+                frame_name, success, _ = completed[seq]
+                commit(frame_name, success, False)
+
+    def _feed_frames(self, loop, frames: asyncio.Queue, stop: threading.Event,
+                     checkpointed: frozenset):
+        """
+        Read and prepare frames, handing them to the event loop (prefetch thread).
+
+        The queue receives a (frame, frame_index, prepared) tuple per frame to
+        process, where prepared is the _prepare_frame output, None if the frame
+        was skipped, the exception raised while preparing it, or _HAS_RESULT if
+        a result already exists. It ends with _END_OF_FRAMES, or with the
+        exception that stopped the iteration.
+
+        Args:
+            loop: Event loop owning the queue
+            frames: Bounded queue consumed by _run_frames
+            stop: Set by the consumer when it stops reading
+            checkpointed: Frame names to skip (already processed per checkpoint)
+        """
+        item = _END_OF_FRAMES
+        frame_iterator = self.dataset_loader.get_frame_iterator(
+            self.config.processing.max_frames
+        )
+        try:
+            for frame_index, frame in enumerate(frame_iterator):
+                frame_name = frame.name
+
+                # Check if a result was already written for this frame
+                if self.output_handler.has_result(frame_name):
+                    prepared = _HAS_RESULT
+                # Skip if already processed (checkpoint)
+                elif frame_name in checkpointed:
+                    logger.debug("Skipping already processed frame: %s", frame_name)
+                    continue
+                else:
+                    try:
+                        prepared = self._prepare_frame(frame, frame_index)
+                    except Exception as e:
+                        prepared = e
+
+                if not _put_threadsafe(loop, frames, (frame, frame_index, prepared), stop):
+                    return
+        except Exception as e:
+            item = e
+        finally:
+            frame_iterator.close()
+        _put_threadsafe(loop, frames, item, stop)
+
+    def _append_checkpoint(self, frame_names: list):
+        """Append newly processed frames to the checkpoint and log progress (throttled)."""
+        self.output_handler.append_checkpoint(frame_names)
+
+        now = time.monotonic()
+        if not self._log_progress or now - self._last_progress_log < PROGRESS_LOG_INTERVAL_SECONDS:
+            return
+        self._last_progress_log = now
+
+        elapsed = now - self.start_time
+        remaining = estimate_remaining_time(
+            self.processed_frames,
+            self.processed_frames + self.skipped_frames + self.failed_frames,
+            elapsed
+        )
+        logger.info(
+            "Checkpoint saved. Processed: %s, Skipped: %s, Failed: %s, "
+            "Elapsed: %s, Remaining: %s",
+            self.processed_frames, self.skipped_frames, self.failed_frames,
+            format_time(elapsed), remaining,
+        )
+
+
+def _put_threadsafe(loop, queue: asyncio.Queue, item, stop: threading.Event) -> bool:
+    """
+    Put an item on an asyncio queue from another thread, waiting while it is full.
+
+    Args:
+        loop: Event loop owning the queue
+        queue: Destination queue
+        item: Item to put
+        stop: Abandon the put once this is set
+
+    Returns:
+        True if the item was queued, False if the consumer stopped first
+    """
+    try:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+    except RuntimeError:
+        # Event loop already closed
+        return False
+    while True:
+        try:
+            future.result(timeout=_PUT_POLL_SECONDS)
+            return True
+        except concurrent.futures.TimeoutError:
+            if stop.is_set():
+                future.cancel()
+                return False
 
 
 def main():
@@ -410,24 +747,29 @@ def main():
 
     # Setup logging
     log_file = config.get_run_dir() / config.output.log_file
-    setup_logging(
+    log_listener = setup_logging(
         str(log_file),
         args.log_level,
         config.logging.console_output,
         config.logging.file_output
     )
 
-    # Validate configuration
     try:
-        config.validate()
-        config.setup_output_dirs()
-    except Exception as e:
-        logger.error(f"Configuration validation failed: {e}")
-        sys.exit(1)
-
-    # Run pipeline
-    pipeline = WaymoE2EPipeline(config)
-    pipeline.run(resume=args.resume)
+        # Validate configuration
+        try:
+            config.validate()
+            config.setup_output_dirs()
+        except Exception as e:
+            logger.error("Configuration validation failed: %s", e)
+            sys.exit(1)
+
+        # Run pipeline
+        pipeline = WaymoE2EPipeline(config)
+        pipeline.run(resume=args.resume)
+    finally:
+        # Flush queued log records before exiting
+        if log_listener is not None:
+            log_listener.stop()
 
 
 if __name__ == "__main__":